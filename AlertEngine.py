@@ -0,0 +1,287 @@
+import json
+import math
+from collections import namedtuple
+from QuoteParser import load_numpy
+
+# kind: 规则类型，见KIND_NAMES；threshold: 价格或涨跌幅阈值；lookback: 突破规则回看的笔数
+AlertRule = namedtuple('AlertRule', ['rule_id', 'symbol', 'kind', 'threshold', 'lookback', 'message'])
+
+KIND_ABOVE, KIND_BELOW, KIND_PCT_ABOVE, KIND_PCT_BELOW, \
+    KIND_CROSS_ABOVE, KIND_CROSS_BELOW, KIND_BREAKOUT_HIGH, KIND_BREAKOUT_LOW = range(8)
+
+KIND_NAMES = {
+    'above': KIND_ABOVE,
+    'below': KIND_BELOW,
+    'pct_above': KIND_PCT_ABOVE,
+    'pct_below': KIND_PCT_BELOW,
+    'cross_above': KIND_CROSS_ABOVE,
+    'cross_below': KIND_CROSS_BELOW,
+    'breakout_high': KIND_BREAKOUT_HIGH,
+    'breakout_low': KIND_BREAKOUT_LOW,
+}
+
+KIND_LABELS = {
+    KIND_ABOVE: "高于",
+    KIND_BELOW: "低于",
+    KIND_PCT_ABOVE: "涨幅达到",
+    KIND_PCT_BELOW: "跌幅达到",
+    KIND_CROSS_ABOVE: "上穿",
+    KIND_CROSS_BELOW: "下穿",
+    KIND_BREAKOUT_HIGH: "突破最高",
+    KIND_BREAKOUT_LOW: "跌破最低",
+}
+
+
+class AlertEngine:
+    """价格提醒引擎
+
+    支持价格阈值、涨跌幅阈值、上穿/下穿以及N笔突破规则。每批行情到来时，
+    所有规则以NumPy数组一次性向量化计算（未安装NumPy或use_numpy为False时逐条计算）。
+    阈值类规则只在条件由不满足变为满足时触发一次，避免每笔行情重复提醒。
+    """
+
+    def __init__(self, max_lookback=120, use_numpy=None):
+        self.max_lookback = max_lookback
+        self.use_numpy = use_numpy
+        self._np = None
+        self._rules = []
+        self._next_id = 1
+        # 新浪代码 -> 行号
+        self._symbols = {}
+        self._compiled = False
+
+    def __len__(self):
+        return len(self._rules)
+
+    def rules(self):
+        return list(self._rules)
+
+    def add_rule(self, symbol, kind, threshold=0.0, lookback=20, message=None):
+        """添加规则，kind为KIND_NAMES中的名称，返回规则编号"""
+        if kind not in KIND_NAMES:
+            raise ValueError(f"未知的提醒类型: {kind}")
+        lookback = max(1, min(int(lookback), self.max_lookback))
+        rule = AlertRule(self._next_id, symbol, KIND_NAMES[kind], float(threshold), lookback, message)
+        self._next_id += 1
+        self._rules.append(rule)
+        self._compiled = False
+        return rule.rule_id
+
+    def remove_rule(self, rule_id):
+        self._rules = [rule for rule in self._rules if rule.rule_id != rule_id]
+        self._compiled = False
+
+    def load_rules(self, path):
+        """从JSON文件加载规则：[{"code": "NQ", "kind": "cross_above", "threshold": 17000}, ...]
+
+        code可以是用户输入的代码（如 159659、NQ），也可以直接写新浪代码（symbol字段）。
+        """
+        from StockFuturesMonitor import StockFuturesMonitor
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            symbol = entry.get('symbol') or StockFuturesMonitor.get_sina_symbol(entry['code'])
+            if symbol is None:
+                continue
+            self.add_rule(symbol, entry['kind'], entry.get('threshold', 0.0),
+                          entry.get('lookback', 20), entry.get('message'))
+
+    def _compile(self):
+        """把规则按类型排序后转换为按列存储的数组，同类规则在数组中连续，计算时按切片处理"""
+        ordered = sorted(self._rules, key=lambda rule: rule.kind)
+        symbols = {}
+        for rule in ordered:
+            symbols.setdefault(rule.symbol, len(symbols))
+        # 保留已有代码的价格窗口和已有规则的触发状态
+        old_symbols = self._symbols
+        old_state = getattr(self, '_symbol_state', None)
+        old_rule_state = dict(zip((rule.rule_id for rule in getattr(self, '_ordered', ())),
+                                  getattr(self, '_last_state', ())))
+        self._ordered = ordered
+        self._symbols = symbols
+        n_symbols = len(symbols)
+        window = self.max_lookback
+        last_state = [bool(old_rule_state.get(rule.rule_id, False)) for rule in ordered]
+
+        # 首次有规则时才导入NumPy
+        np = self._np = load_numpy() if self.use_numpy is None or self.use_numpy else None
+        if np is not None:
+            kinds = np.array([r.kind for r in ordered], dtype=np.int8)
+            bounds = np.searchsorted(kinds, np.arange(len(KIND_NAMES) + 1))
+            self._slices = [slice(int(bounds[k]), int(bounds[k + 1])) for k in range(len(KIND_NAMES))]
+            self._rule_symbol = np.array([symbols[r.symbol] for r in ordered], dtype=np.intp)
+            self._threshold = np.array([r.threshold for r in ordered], dtype=np.float64)
+            self._lookback = np.array([r.lookback for r in ordered], dtype=np.intp)
+            breakout = slice(self._slices[KIND_BREAKOUT_HIGH].start, self._slices[KIND_BREAKOUT_LOW].stop)
+            # 只对有突破规则的代码计算最近N笔的最高/最低价
+            breakout_rows, breakout_index = np.unique(self._rule_symbol[breakout], return_inverse=True)
+            self._breakout_rows = breakout_rows
+            self._breakout_index = breakout_index.reshape(-1)
+            self._breakout_depth = int(self._lookback[breakout].max()) if breakout_rows.size else 0
+            self._last_state = np.array(last_state, dtype=np.bool_)
+            prev = np.full(n_symbols, np.nan)
+            # 每行为一个代码最近的价格，第0列最新
+            prices = np.full((n_symbols, window), np.nan)
+            filled = np.zeros(n_symbols, dtype=np.intp)
+        else:
+            self._last_state = last_state
+            prev = [math.nan] * n_symbols
+            prices = [[math.nan] * window for _ in range(n_symbols)]
+            filled = [0] * n_symbols
+
+        if old_state is not None:
+            for symbol, row in symbols.items():
+                old_row = old_symbols.get(symbol)
+                if old_row is not None:
+                    prev[row] = old_state[0][old_row]
+                    prices[row] = old_state[1][old_row]
+                    filled[row] = old_state[2][old_row]
+        self._symbol_state = (prev, prices, filled)
+        self._compiled = True
+
+    def evaluate(self, quotes):
+        """用一批行情 {新浪代码: 行情字典} 计算所有规则，返回触发的 [(规则, 现价), ...]"""
+        if not self._rules:
+            return []
+        if not self._compiled:
+            self._compile()
+        n_symbols = len(self._symbols)
+        np = self._np
+        if np is not None:
+            price = np.full(n_symbols, np.nan)
+            prev_close = np.full(n_symbols, np.nan)
+        else:
+            price = [math.nan] * n_symbols
+            prev_close = [math.nan] * n_symbols
+        # 按代码（而不是按规则）组装本批数据
+        for symbol, data in quotes.items():
+            row = self._symbols.get(symbol)
+            if row is None or 'error' in data:
+                continue
+            price[row] = data['current_price']
+            prev_close[row] = data['yesterday_close']
+        return self.evaluate_arrays(price, prev_close)
+
+    def symbol_rows(self):
+        """返回 {新浪代码: 行号}，供直接调用evaluate_arrays的调用方按行号组装数组"""
+        if not self._compiled:
+            self._compile()
+        return dict(self._symbols)
+
+    def evaluate_arrays(self, price, prev_close):
+        """price/prev_close 按代码行号排列，本批没有数据的代码为NaN，返回触发的 [(规则, 现价), ...]"""
+        if not self._compiled:
+            self._compile()
+        np = self._np
+        if np is None:
+            return self._evaluate_python(price, prev_close)
+
+        prev, window, filled = self._symbol_state
+        updated = ~np.isnan(price)
+        rs = self._rule_symbol
+        p = price[rs]
+        thr = self._threshold
+        sl = self._slices
+        fired = np.zeros(len(rs), dtype=np.bool_)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 阈值类规则：条件由不满足变为满足时触发
+            level = slice(0, sl[KIND_PCT_BELOW].stop)
+            state = np.empty(level.stop, dtype=np.bool_)
+            s = sl[KIND_ABOVE]
+            state[s] = p[s] >= thr[s]
+            s = sl[KIND_BELOW]
+            state[s] = p[s] <= thr[s]
+            pct_rows = rs[sl[KIND_PCT_ABOVE].start:level.stop]
+            pct = (price[pct_rows] - prev_close[pct_rows]) / prev_close[pct_rows] * 100
+            offset = sl[KIND_PCT_ABOVE].start
+            s = sl[KIND_PCT_ABOVE]
+            state[s] = pct[s.start - offset:s.stop - offset] >= thr[s]
+            s = sl[KIND_PCT_BELOW]
+            state[s] = pct[s.start - offset:s.stop - offset] <= thr[s]
+            rule_updated = updated[rs[level]]
+            last_state = self._last_state[level]
+            fired[level] = rule_updated & state & ~last_state
+            # 本批没有数据的规则保持原状态
+            self._last_state[level] = np.where(rule_updated, state, last_state)
+
+            # 上穿/下穿：与该代码上一笔价格比较
+            s = sl[KIND_CROSS_ABOVE]
+            fired[s] = (prev[rs[s]] < thr[s]) & (p[s] >= thr[s])
+            s = sl[KIND_CROSS_BELOW]
+            fired[s] = (prev[rs[s]] > thr[s]) & (p[s] <= thr[s])
+
+            if self._breakout_depth:
+                # 窗口由新到旧排列，累计最高/最低后第N-1列即为最近N笔（不含本笔）的最高/最低价，
+                # 计算量只与代码数和最长回看笔数有关，与规则数量无关
+                recent = window[self._breakout_rows, :self._breakout_depth]
+                index = self._breakout_index
+                column = self._lookback - 1
+                s = sl[KIND_BREAKOUT_HIGH]
+                n_high = s.stop - s.start
+                if n_high:
+                    high = np.maximum.accumulate(recent, axis=1)[index[:n_high], column[s]]
+                    fired[s] = (filled[rs[s]] >= self._lookback[s]) & (p[s] > high)
+                s = sl[KIND_BREAKOUT_LOW]
+                if s.stop > s.start:
+                    low = np.minimum.accumulate(recent, axis=1)[index[n_high:], column[s]]
+                    fired[s] = (filled[rs[s]] >= self._lookback[s]) & (p[s] < low)
+
+        # 更新各代码的上一笔价格和价格窗口
+        rows = np.nonzero(updated)[0]
+        if rows.size:
+            prev[rows] = price[rows]
+            window[rows, 1:] = window[rows, :-1]
+            window[rows, 0] = price[rows]
+            filled[rows] += 1
+
+        index = np.flatnonzero(fired)
+        return list(zip(map(self._ordered.__getitem__, index.tolist()), p[index].tolist()))
+
+    def _evaluate_python(self, price, prev_close):
+        prev, window, filled = self._symbol_state
+        fired = []
+        for i, rule in enumerate(self._ordered):
+            row = self._symbols[rule.symbol]
+            p = price[row]
+            if math.isnan(p):
+                continue
+            kind, thr = rule.kind, rule.threshold
+            if kind <= KIND_PCT_BELOW:
+                pc = prev_close[row]
+                pct = (p - pc) / pc * 100 if pc else math.nan
+                state = ((kind == KIND_ABOVE and p >= thr) or (kind == KIND_BELOW and p <= thr) or
+                         (kind == KIND_PCT_ABOVE and pct >= thr) or (kind == KIND_PCT_BELOW and pct <= thr))
+                if state and not self._last_state[i]:
+                    fired.append((rule, p))
+                self._last_state[i] = state
+            elif kind == KIND_CROSS_ABOVE:
+                if prev[row] < thr <= p:
+                    fired.append((rule, p))
+            elif kind == KIND_CROSS_BELOW:
+                if prev[row] > thr >= p:
+                    fired.append((rule, p))
+            elif filled[row] >= rule.lookback:
+                recent = window[row][:rule.lookback]
+                if (kind == KIND_BREAKOUT_HIGH and p > max(recent)) or (kind == KIND_BREAKOUT_LOW and p < min(recent)):
+                    fired.append((rule, p))
+        for row, p in enumerate(price):
+            if math.isnan(p):
+                continue
+            prev[row] = p
+            window[row].insert(0, p)
+            window[row].pop()
+            filled[row] += 1
+        return fired
+
+    @staticmethod
+    def format_alert(rule, price):
+        """生成提醒文本"""
+        if rule.message:
+            return rule.message
+        label = KIND_LABELS[rule.kind]
+        if rule.kind in (KIND_BREAKOUT_HIGH, KIND_BREAKOUT_LOW):
+            return f"{rule.symbol} {label}（近{rule.lookback}笔），现价 {price:.3f}"
+        if rule.kind in (KIND_PCT_ABOVE, KIND_PCT_BELOW):
+            return f"{rule.symbol} {label} {rule.threshold:.2f}%，现价 {price:.3f}"
+        return f"{rule.symbol} {label} {rule.threshold:.3f}，现价 {price:.3f}"
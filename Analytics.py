@@ -0,0 +1,222 @@
+"""逐笔增量计算的衍生指标
+
+每个代码维护成交量加权均价（VWAP）、指数移动平均（EMA）和最近N笔对数收益率的滚动波动率，
+每笔行情只做常数次运算，不需要回看全部历史。还可以定义两个品种之间的价差或比值
+（如ETF与hf_NQ期货），作为合成品种同样计算EMA和波动率，并以行情字典的形式交给提醒引擎。
+"""
+import math
+import re
+from collections import deque, namedtuple
+from StockFuturesMonitor import StockFuturesMonitor
+
+# kind: 'spread' 为 a - multiplier * b，'ratio' 为 a / (multiplier * b)
+SpreadDef = namedtuple('SpreadDef', ['name', 'symbol_a', 'symbol_b', 'kind', 'multiplier'])
+
+# 价差表达式：A-B、A/B，B前面可以带系数，如 NQ-2.5*159659
+SPREAD_PATTERN = re.compile(r'^\s*([^\s\-/*]+)\s*([-/])\s*(?:([0-9.]+)\s*\*\s*)?([^\s\-/*]+)\s*$')
+
+
+def parse_spread(expression):
+    """解析价差表达式，返回SpreadDef，名称为表达式本身；代码可以是用户代码或新浪代码"""
+    match = SPREAD_PATTERN.match(expression)
+    if match is None:
+        raise ValueError(f"无法识别的价差表达式: {expression}")
+    code_a, operator, multiplier, code_b = match.groups()
+    symbol_a = StockFuturesMonitor.get_sina_symbol(code_a)
+    symbol_b = StockFuturesMonitor.get_sina_symbol(code_b)
+    if symbol_a is None or symbol_b is None:
+        raise ValueError(f"价差表达式中的代码无法查询: {expression}")
+    try:
+        multiplier = float(multiplier) if multiplier else 1.0
+    except ValueError:
+        raise ValueError(f"无法识别的价差表达式: {expression}") from None
+    if multiplier == 0:
+        raise ValueError(f"价差表达式的系数不能为0: {expression}")
+    return SpreadDef(expression.strip(), symbol_a, symbol_b, 'ratio' if operator == '/' else 'spread',
+                     multiplier)
+
+
+class InstrumentStats:
+    """一个品种的增量指标
+
+    成交量为当日累计值：有累计成交额时VWAP直接为成交额/成交量，否则按每笔成交量增量加权；
+    累计成交量变小时视为进入新的交易日，VWAP重新开始计算。波动率为最近window笔对数收益率的
+    标准差（%），用滑动窗口的和与平方和增量维护，每window笔重新求和一次以消除浮点误差累积。
+    relative为False时（价差可能为0或负数）按相邻两笔的差值计算，波动率与价格单位相同。
+    """
+    __slots__ = ('alpha', 'window', 'relative', 'price', 'prev_close', 'ticks', 'ema', 'vwap', 'volume',
+                 '_pv', '_v', '_returns', '_sum', '_sumsq', '_since_resum')
+
+    def __init__(self, ema_span=20, window=60, relative=True):
+        self.alpha = 2.0 / (ema_span + 1)
+        self.window = window
+        self.relative = relative
+        self.price = None
+        self.prev_close = None
+        self.ticks = 0
+        self.ema = None
+        self.vwap = None
+        self.volume = None
+        self._pv = 0.0
+        self._v = 0.0
+        self._returns = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_resum = 0
+
+    def update(self, price, prev_close=None, volume=None, turnover=None):
+        """记录一笔行情，价格和成交量都未变化时不计为新的一笔，返回是否更新"""
+        if (self.relative and price <= 0) or (price == self.price and volume == self.volume):
+            return False
+        last = self.price
+        self.price = price
+        if prev_close is not None:
+            self.prev_close = prev_close
+        self.ticks += 1
+        self.ema = price if self.ema is None else self.ema + self.alpha * (price - self.ema)
+
+        if volume:
+            if self.volume is None or volume < self.volume:
+                self._pv = self._v = 0.0
+                delta = volume
+            else:
+                delta = volume - self.volume
+            if turnover:
+                self.vwap = turnover / volume
+            elif delta > 0:
+                self._pv += price * delta
+                self._v += delta
+                self.vwap = self._pv / self._v
+            self.volume = volume
+
+        if last is not None:
+            r = math.log(price / last) if self.relative else price - last
+            returns = self._returns
+            returns.append(r)
+            self._sum += r
+            self._sumsq += r * r
+            if len(returns) > self.window:
+                old = returns.popleft()
+                self._sum -= old
+                self._sumsq -= old * old
+                self._since_resum += 1
+                if self._since_resum >= self.window:
+                    self._sum = sum(returns)
+                    self._sumsq = sum(x * x for x in returns)
+                    self._since_resum = 0
+        return True
+
+    @property
+    def volatility(self):
+        """滚动波动率（%），样本不足两笔时为None"""
+        n = len(self._returns)
+        if n < 2:
+            return None
+        variance = (self._sumsq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(0.0, variance)) * (100 if self.relative else 1)
+
+    def as_dict(self):
+        return {'price': self.price, 'ticks': self.ticks, 'vwap': self.vwap, 'ema': self.ema,
+                'volatility': self.volatility, 'relative': self.relative}
+
+
+class Analytics:
+    """按代码维护增量指标，并计算品种之间的价差/比值"""
+
+    def __init__(self, ema_span=20, window=60):
+        self.ema_span = ema_span
+        self.window = window
+        # 新浪代码或价差名称 -> InstrumentStats
+        self._stats = {}
+        self._spreads = {}
+        # 新浪代码 -> 用到该代码的价差列表
+        self._legs = {}
+
+    def __len__(self):
+        return len(self._stats)
+
+    def _get(self, key, relative=True):
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = InstrumentStats(self.ema_span, self.window, relative)
+        return stats
+
+    def add_spread(self, spread):
+        """添加价差，spread为SpreadDef或价差表达式"""
+        if isinstance(spread, str):
+            spread = parse_spread(spread)
+        if spread.kind not in ('spread', 'ratio'):
+            raise ValueError(f"未知的价差类型: {spread.kind}")
+        self._spreads[spread.name] = spread
+        for symbol in (spread.symbol_a, spread.symbol_b):
+            self._legs.setdefault(symbol, []).append(spread)
+        return spread
+
+    def spreads(self):
+        return list(self._spreads.values())
+
+    def is_spread(self, name):
+        return name in self._spreads
+
+    def stats(self, key):
+        """返回代码或价差的指标字典，没有数据时返回None"""
+        stats = self._stats.get(key)
+        return stats.as_dict() if stats is not None and stats.ticks else None
+
+    @staticmethod
+    def _combine(spread, a, b):
+        if spread.kind == 'spread':
+            return a - spread.multiplier * b
+        return a / (spread.multiplier * b) if b else None
+
+    def update(self, quotes):
+        """用一批行情 {新浪代码: 行情字典} 更新指标
+
+        返回受影响的价差 {价差名称: 行情字典}，字典包含current_price、yesterday_close、
+        change_amount和change_percent，可以与原始行情合并后交给AlertEngine.evaluate。
+        """
+        touched = {}
+        for symbol, data in quotes.items():
+            if 'error' in data:
+                continue
+            updated = self._get(symbol).update(data['current_price'], data.get('yesterday_close'),
+                                               data.get('volume'), data.get('turnover'))
+            if updated:
+                for spread in self._legs.get(symbol, ()):
+                    touched[spread.name] = spread
+        results = {}
+        for name, spread in touched.items():
+            a = self._stats.get(spread.symbol_a)
+            b = self._stats.get(spread.symbol_b)
+            if a is None or b is None or a.price is None or b.price is None:
+                continue
+            value = self._combine(spread, a.price, b.price)
+            if value is None:
+                continue
+            prev = None
+            if a.prev_close and b.prev_close:
+                prev = self._combine(spread, a.prev_close, b.prev_close)
+            self._get(name, relative=spread.kind == 'ratio').update(value, prev)
+            change = value - prev if prev is not None else 0.0
+            results[name] = {
+                'type': 'spread',
+                'spread_name': name,
+                'current_price': value,
+                'yesterday_close': prev if prev is not None else value,
+                'change_amount': change,
+                'change_percent': change / abs(prev) * 100 if prev else 0.0,
+            }
+        return results
+
+    @staticmethod
+    def format_stats(stats):
+        """把指标字典格式化为一行文本"""
+        parts = []
+        if stats.get('vwap') is not None:
+            parts.append(f"VWAP {stats['vwap']:.3f}")
+        if stats.get('ema') is not None:
+            parts.append(f"EMA {stats['ema']:.3f}")
+        if stats.get('volatility') is not None:
+            unit = "%" if stats.get('relative', True) else ""
+            parts.append(f"波动率 {stats['volatility']:.3f}{unit}")
+        return "  ".join(parts)
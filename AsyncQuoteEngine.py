@@ -0,0 +1,208 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+from StockFuturesMonitor import StockFuturesMonitor
+from QuoteParser import parse_quotes
+from SinaSession import SinaSession
+
+
+class HttpError(Exception):
+    """HTTP响应异常"""
+    pass
+
+
+class _Connection:
+    """一条keep-alive的HTTP/1.1连接"""
+    __slots__ = ('reader', 'writer', 'reused')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncQuoteEngine:
+    """基于asyncio的批量行情引擎
+
+    将代码按新浪 list= 参数批量打包，在有限数量的keep-alive连接上并发请求，
+    并以异步迭代器的形式逐个输出解析好的行情。
+
+    用法：
+        engine = AsyncQuoteEngine(max_connections=8)
+        async for code, quote in engine.stream(codes):
+            ...
+        await engine.close()
+    """
+
+    def __init__(self, max_connections=8, max_url_length=None, connect_timeout=3.05,
+                 read_timeout=10, headers=None):
+        self.max_connections = max_connections
+        self.max_url_length = max_url_length
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.headers = headers or SinaSession.DEFAULT_HEADERS
+        self._semaphore = None
+        # (host, port) -> 空闲连接列表
+        self._idle = {}
+        # 统计信息
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _get_semaphore(self):
+        # 在事件循环中首次使用时再创建，避免绑定到错误的事件循环
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._semaphore
+
+    async def _acquire(self, host, port):
+        idle = self._idle.get((host, port))
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.connect_timeout)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _release(self, host, port, conn):
+        self._idle.setdefault((host, port), []).append(conn)
+
+    async def _read_response(self, conn):
+        """读取一个HTTP响应，返回 (状态码, 响应体, 是否保持连接)"""
+        reader = conn.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("连接已被服务器关闭")
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise HttpError(f"无效的响应行: {status_line!r}")
+        version, status = parts[0], int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version != 'HTTP/1.0' and headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    # 跳过trailer
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, body, keep_alive
+
+    async def fetch_url(self, url):
+        """请求一个URL并返回GBK解码后的文本"""
+        parts = urlsplit(url)
+        host = parts.hostname
+        port = parts.port or 80
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        async with self._get_semaphore():
+            self.requests += 1
+            # 复用的连接可能已被服务器关闭，此时换一条新连接重试一次
+            for attempt in range(2):
+                conn = await self._acquire(host, port)
+                try:
+                    conn.writer.write(request)
+                    await conn.writer.drain()
+                    status, body, keep_alive = await asyncio.wait_for(
+                        self._read_response(conn), self.read_timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    if conn.reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                if keep_alive:
+                    self._release(host, port, conn)
+                else:
+                    conn.close()
+                break
+
+        if status != 200:
+            raise HttpError(f"请求失败，状态码: {status}")
+        return body.decode('gbk', errors='replace')
+
+    async def _fetch_batch(self, url, symbol_codes):
+        """请求一个批量URL，返回 [(代码, 行情字典), ...]"""
+        symbols = url[len(StockFuturesMonitor.QUOTE_URL):].split(',')
+        try:
+            quotes = parse_quotes(await self.fetch_url(url))
+        except Exception as e:
+            error = {'error': f"批量获取数据时出错: {e}"}
+            return [(code, error) for symbol in symbols for code in symbol_codes[symbol]]
+        return [
+            (code, StockFuturesMonitor.quote_result(quotes.get(symbol)))
+            for symbol in symbols
+            for code in symbol_codes[symbol]
+        ]
+
+    async def stream(self, codes):
+        """并发获取所有代码的行情，按批次完成顺序逐个产出 (代码, 行情字典)"""
+        results, symbol_codes = StockFuturesMonitor.group_codes(codes)
+        for code, result in results.items():
+            if result is not None:
+                yield code, result
+
+        urls = StockFuturesMonitor.build_batch_urls(list(symbol_codes), self.max_url_length)
+        tasks = [asyncio.ensure_future(self._fetch_batch(url, symbol_codes)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for item in await next_done:
+                    yield item
+        finally:
+            # 迭代被提前中止时取消剩余请求
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_all(self, codes):
+        """并发获取所有代码的行情，返回以代码为键的字典"""
+        return {code: quote async for code, quote in self.stream(codes)}
+
+    async def watch(self, codes, interval):
+        """每隔interval秒扫描一次全部代码，每轮产出一个 {代码: 行情字典}"""
+        codes = list(codes)
+        while True:
+            start = time.monotonic()
+            yield await self.fetch_all(codes)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    async def close(self):
+        """关闭所有空闲连接"""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
@@ -0,0 +1,179 @@
+"""行情获取与界面刷新各阶段的耗时统计
+
+各阶段（建立连接、HTTP往返、GBK解码、解析、界面更新、重绘等）调用
+Diagnostics.record 记录一次耗时，样本保存在固定容量的滚动窗口中，记录开销只有一次
+数组写入；百分位数和直方图只在显示或导出时计算。
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from collections import deque
+
+
+def _pad(text, width, right=False):
+    """按显示宽度（中文字符占两列）补齐空格"""
+    text = str(text)
+    padding = ' ' * max(0, width - sum(2 if ord(ch) > 0x7f else 1 for ch in text))
+    return padding + text if right else text + padding
+
+
+class RollingHistogram:
+    """最近capacity个耗时样本（毫秒）的滚动统计"""
+    # 直方图各桶的上界（毫秒）
+    BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._values = array('d', bytes(8 * capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+        self.total = 0
+
+    def add(self, milliseconds, timestamp):
+        i = self._next
+        self._values[i] = milliseconds
+        self._times[i] = timestamp
+        self._next = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.total += 1
+
+    def values(self):
+        """窗口内的样本，按时间由旧到新"""
+        if self._size < self.capacity:
+            return self._values[:self._size].tolist()
+        return (self._values[self._next:] + self._values[:self._next]).tolist()
+
+    def summary(self, now=None):
+        """窗口内样本的次数、每秒次数、平均值、百分位数、最大值和直方图
+
+        直方图为累计计数：buckets[上界] 为耗时不超过该上界（毫秒）的样本数。
+        """
+        values = sorted(self.values())
+        count = len(values)
+        result = {'total': self.total, 'count': count}
+        if not count:
+            return result
+        now = time.time() if now is None else now
+        oldest = min(self._times[:self._size]) if self._size < self.capacity else self._times[self._next]
+        span = now - oldest
+        result['rate'] = count / span if span > 0 else 0.0
+        result['mean'] = sum(values) / count
+        for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            result[name] = values[min(count - 1, int(count * q))]
+        result['max'] = values[-1]
+        buckets = {}
+        i = 0
+        for bound in self.BUCKETS:
+            while i < count and values[i] <= bound:
+                i += 1
+            buckets[f"{bound:g}"] = i
+        buckets['inf'] = count
+        result['buckets'] = buckets
+        return result
+
+
+class Diagnostics:
+    """进程内共享的各阶段耗时统计"""
+    # 按显示顺序排列的已知阶段，其他名称的阶段排在后面
+    STAGES = ('connect', 'http', 'decode', 'parse', 'fetch', 'dispatch', 'ui_update', 'repaint')
+    STAGE_LABELS = {
+        'connect': "建立连接",
+        'http': "HTTP往返",
+        'decode': "GBK解码",
+        'parse': "解析",
+        'fetch': "后台获取",
+        'dispatch': "信号投递",
+        'ui_update': "界面更新",
+        'repaint': "重绘",
+    }
+    # 计数器的速率按最近多少秒计算
+    RATE_WINDOW = 10.0
+
+    enabled = True
+    capacity = 1024
+    _histograms = {}
+    _counters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, stage, seconds):
+        """记录某阶段的一次耗时（秒）"""
+        if not cls.enabled:
+            return
+        with cls._lock:
+            histogram = cls._histograms.get(stage)
+            if histogram is None:
+                histogram = cls._histograms[stage] = RollingHistogram(cls.capacity)
+            histogram.add(seconds * 1000.0, time.time())
+
+    @classmethod
+    def count(cls, name, n=1):
+        """累加计数器，如获取的行情条数，用于计算吞吐量"""
+        if not cls.enabled:
+            return
+        now = time.time()
+        with cls._lock:
+            counter = cls._counters.get(name)
+            if counter is None:
+                counter = cls._counters[name] = [0, deque()]
+            counter[0] += n
+            events = counter[1]
+            events.append((now, n))
+            while events and events[0][0] < now - cls.RATE_WINDOW:
+                events.popleft()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._histograms.clear()
+            cls._counters.clear()
+
+    @classmethod
+    def summary(cls):
+        """返回 {'stages': {阶段: 统计}, 'counters': {名称: {'total', 'rate'}}}"""
+        now = time.time()
+        order = {stage: i for i, stage in enumerate(cls.STAGES)}
+        with cls._lock:
+            histograms = sorted(cls._histograms.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+            stages = {stage: histogram.summary(now) for stage, histogram in histograms}
+            counters = {}
+            for name, (total, events) in cls._counters.items():
+                recent = sum(n for t, n in events if t >= now - cls.RATE_WINDOW)
+                counters[name] = {'total': total, 'rate': recent / cls.RATE_WINDOW}
+        return {'stages': stages, 'counters': counters}
+
+    @classmethod
+    def format_table(cls, summary=None):
+        """把统计结果格式化为等宽文本表格"""
+        summary = cls.summary() if summary is None else summary
+        lines = [_pad("阶段", 10) + ''.join(_pad(title, 9, True) for title in
+                                            ("次数", "次/秒", "p50", "p90", "p99", "最大")) + "  (ms)"]
+        for stage, s in summary['stages'].items():
+            label = _pad(cls.STAGE_LABELS.get(stage, stage), 10)
+            if not s['count']:
+                lines.append(f"{label}{s['total']:>9}")
+                continue
+            lines.append(f"{label}{s['total']:>9}{s['rate']:>9.2f}{s['p50']:>9.2f}{s['p90']:>9.2f}"
+                         f"{s['p99']:>9.2f}{s['max']:>9.2f}")
+        for name, c in summary['counters'].items():
+            lines.append(f"{name}: 共{c['total']}，{c['rate']:.1f}/秒")
+        return '\n'.join(lines)
+
+    @classmethod
+    def dump(cls, path, extra=None):
+        """把统计结果和窗口内的原始样本写入JSON文件，供离线分析"""
+        summary = cls.summary()
+        with cls._lock:
+            summary['samples'] = {stage: histogram.values() for stage, histogram in cls._histograms.items()}
+        summary['timestamp'] = time.time()
+        if extra:
+            summary.update(extra)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import threading
+from collections import namedtuple
+
+# 交易所前缀（sh/sz/nq）和品种类型（stock/fund/bond/b_share）
+Resolution = namedtuple('Resolution', ['exchange', 'instrument_type'])
+
+
+class ExchangeResolver:
+    """基于前缀查找表的股票代码交易所解析器
+
+    前缀表从 res/exchange_prefixes.json 加载，按最长前缀匹配，结果按代码缓存，
+    新增板块前缀只需修改数据文件。
+    """
+    DATA_FILE = os.path.join('res', 'exchange_prefixes.json')
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, table):
+        default = table.get('default', {'exchange': 'sz', 'type': 'stock'})
+        self._default_resolution = Resolution(default['exchange'], default['type'])
+        # 前缀 -> Resolution
+        self._prefixes = {}
+        self._max_prefix_len = 0
+        self._cache = {}
+        for entry in table.get('prefixes', []):
+            self.add_prefix(entry['prefix'], entry['exchange'], entry['type'])
+
+    @staticmethod
+    def data_path():
+        """获取前缀数据文件路径，支持PyInstaller打包"""
+        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(base_path, ExchangeResolver.DATA_FILE)
+
+    @classmethod
+    def load(cls, path=None):
+        """从JSON数据文件创建解析器"""
+        with open(path or cls.data_path(), 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def default(cls):
+        """获取进程内共享的解析器实例"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls.load()
+        return cls._default
+
+    def add_prefix(self, prefix, exchange, instrument_type):
+        """添加或覆盖一个前缀规则"""
+        self._prefixes[prefix] = Resolution(exchange, instrument_type)
+        self._max_prefix_len = max(self._max_prefix_len, len(prefix))
+        self._cache.clear()
+
+    def resolve(self, code):
+        """返回代码对应的 Resolution(交易所, 品种类型)"""
+        resolution = self._cache.get(code)
+        if resolution is not None:
+            return resolution
+        resolution = self._default_resolution
+        prefixes = self._prefixes
+        for length in range(min(self._max_prefix_len, len(code)), 0, -1):
+            match = prefixes.get(code[:length])
+            if match is not None:
+                resolution = match
+                break
+        self._cache[code] = resolution
+        return resolution
+
+    def resolve_many(self, codes):
+        """批量解析代码，按交易所分组返回 {交易所: [代码, ...]}"""
+        groups = {}
+        resolve = self.resolve
+        for code in codes:
+            groups.setdefault(resolve(code).exchange, []).append(code)
+        return groups
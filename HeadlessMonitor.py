@@ -0,0 +1,187 @@
+"""无界面行情监控
+
+不加载PyQt5，按刷新间隔批量获取行情（或接收SSE推送行情）并以NDJSON或CSV逐行输出到
+标准输出或文件，适合在服务器上常驻运行。收到SIGTERM/SIGINT后写完当前批次再退出。
+
+命令行用法：
+    python HeadlessMonitor.py 159659 NQ --interval 1
+    python HeadlessMonitor.py --symbols-file codes.txt --format csv --output quotes.csv
+    python HeadlessMonitor.py 159659 NQ --stream http://127.0.0.1:8000/stream
+    python main.py --headless --symbols-file codes.txt
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import signal
+import sys
+import threading
+from StockFuturesMonitor import StockFuturesMonitor
+from QuoteProvider import PollingQuoteProvider, StreamingQuoteProvider
+
+
+def read_symbols_file(path):
+    """读取代码列表文件，代码之间用换行、逗号或空白分隔，#之后为注释"""
+    codes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            codes.extend(code for code in re.split(r'[,，\s]+', line) if code)
+    return codes
+
+
+class QuoteWriter:
+    """把行情逐行写为NDJSON或CSV"""
+    FORMATS = ('ndjson', 'csv')
+    CSV_COLUMNS = ('timestamp', 'code', 'type', 'name', 'current_price', 'yesterday_close', 'open_price',
+                   'high_price', 'low_price', 'change_amount', 'change_percent', 'update_time', 'error')
+
+    def __init__(self, stream, fmt='ndjson', header=True):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"不支持的输出格式: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.writer(stream, lineterminator='\n')
+            if header:
+                self._csv.writerow(self.CSV_COLUMNS)
+
+    def write(self, code, data, timestamp):
+        if self._csv is not None:
+            row = dict(data, timestamp=f"{timestamp:.3f}", code=code,
+                       name=data.get('stock_name', data.get('futures_name', '')))
+            self._csv.writerow([row.get(column, '') for column in self.CSV_COLUMNS])
+        else:
+            record = {'timestamp': round(timestamp, 3), 'code': code}
+            record.update(data)
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+
+class HeadlessMonitor:
+    """无界面的行情监控循环
+
+    订阅行情提供者并输出收到的每批行情。默认使用PollingQuoteProvider，复用RefreshScheduler的
+    自适应间隔、交易时段和请求预算；也可以传入StreamingQuoteProvider接收推送行情。
+    changes_only为True时，价格和更新时间都未变化的行情不重复输出。
+    """
+
+    def __init__(self, codes, writer, provider=None, changes_only=False):
+        self.codes = list(dict.fromkeys(code.strip() for code in codes if code.strip()))
+        self.writer = writer
+        self.provider = provider if provider is not None else PollingQuoteProvider()
+        self.changes_only = changes_only
+        self._last = {}
+        self._stop = threading.Event()
+        self._error = None
+        self.max_batches = None
+        self.batches = 0
+
+    def stop(self, *args):
+        """请求退出，可直接用作信号处理函数"""
+        self._stop.set()
+
+    def on_quotes(self, results, fetched_at):
+        """输出一批行情（在行情提供者的后台线程中执行），返回输出的行数"""
+        if self._stop.is_set():
+            return 0
+        written = 0
+        try:
+            for code, data in results.items():
+                if self.changes_only and 'error' not in data:
+                    key = (data['current_price'], data['update_time'])
+                    if self._last.get(code) == key:
+                        continue
+                    self._last[code] = key
+                self.writer.write(code, data, fetched_at)
+                written += 1
+            self.writer.flush()
+        except OSError as e:
+            # 输出失败（如下游管道已关闭）时交给run在主线程中抛出
+            self._error = e
+            self._stop.set()
+            return written
+        self.batches += 1
+        if self.max_batches is not None and self.batches >= self.max_batches:
+            self._stop.set()
+        return written
+
+    def run(self, max_batches=None):
+        """输出行情直到stop()被调用、回放结束或达到max_batches批"""
+        self.max_batches = max_batches
+        self.provider.add_listener(self.on_quotes)
+        self.provider.subscribe({code: StockFuturesMonitor.get_sina_symbol(code) for code in self.codes})
+        self.provider.start()
+        try:
+            # 定时醒来以便及时响应信号
+            while not self._stop.wait(0.2):
+                if self.provider.finished:
+                    break
+        finally:
+            self.provider.stop()
+            self.provider.remove_listener(self.on_quotes)
+        if self._error is not None:
+            raise self._error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面行情监控，以NDJSON或CSV输出行情")
+    parser.add_argument('codes', nargs='*', help="股票或期货代码，如 159659 NQ")
+    parser.add_argument('--symbols-file', metavar='FILE', help="代码列表文件，每行一个或用逗号分隔")
+    parser.add_argument('--interval', type=float, default=1.0, help="刷新间隔（秒），默认1")
+    parser.add_argument('--format', choices=QuoteWriter.FORMATS, default='ndjson', help="输出格式，默认ndjson")
+    parser.add_argument('--output', metavar='FILE', help="追加写入该文件，默认输出到标准输出")
+    parser.add_argument('--changes-only', action='store_true', help="只输出有变化的行情")
+    parser.add_argument('--count', type=int, default=None, help="获取指定批数后退出")
+    parser.add_argument('--replay', metavar='PATH', help="回放录制的原始响应文件或逐笔记录目录，不访问网络")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速，默认1")
+    parser.add_argument('--stream', metavar='URL', help="连接SSE推送源接收行情，不再按刷新间隔轮询")
+    parser.add_argument('--diagnostics', metavar='FILE', help="退出时将各阶段耗时统计导出到该文件")
+    args = parser.parse_args(argv)
+
+    codes = list(args.codes)
+    if args.symbols_file:
+        codes.extend(read_symbols_file(args.symbols_file))
+    if not codes:
+        parser.error("请指定代码或 --symbols-file")
+    if args.interval <= 0:
+        parser.error("刷新间隔必须大于0")
+
+    data_source = StockFuturesMonitor
+    if args.replay:
+        from ReplaySource import ReplaySource
+        if os.path.isdir(args.replay):
+            data_source = ReplaySource.from_tick_segments(args.replay, speed=args.speed)
+        else:
+            data_source = ReplaySource.from_payload_file(args.replay, speed=args.speed)
+
+    stream = open(args.output, 'a', encoding='utf-8', newline='') if args.output else sys.stdout
+    # 追加到已有CSV文件时不重复写表头
+    writer = QuoteWriter(stream, args.format, header=stream is sys.stdout or stream.tell() == 0)
+    if args.stream:
+        provider = StreamingQuoteProvider(args.stream)
+    else:
+        provider = PollingQuoteProvider(data_source, args.interval)
+    monitor = HeadlessMonitor(codes, writer, provider, args.changes_only)
+    signal.signal(signal.SIGTERM, monitor.stop)
+    signal.signal(signal.SIGINT, monitor.stop)
+    try:
+        monitor.run(args.count)
+    except BrokenPipeError:
+        # 下游管道已关闭（如 | head），把标准输出指向空设备后静默退出
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        if args.diagnostics:
+            from Diagnostics import Diagnostics
+            Diagnostics.dump(args.diagnostics)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
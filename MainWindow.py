@@ -1,15 +1,56 @@
 import sys
 import os
-from PyQt5 import QtWidgets, uic, QtCore, QtGui
+import re
+import threading
+import time
+from PyQt5 import QtWidgets, QtCore, QtGui
 from StockFuturesMonitor import StockFuturesMonitor
+from SinaSession import SinaSession
+from QuoteFetcher import QuoteSubscription
+from QuoteProvider import PollingQuoteProvider
+from TickHistory import TickHistory
+from QuoteParser import quote_timestamp
+from WatchlistModel import WatchlistModel, SparklineDelegate
+from QuoteCache import QuoteCache
+from AlertEngine import AlertEngine
+from Analytics import Analytics
+from Diagnostics import Diagnostics
+from Settings import Settings
+
+try:
+    # 由 pyuic5 MainWindow.ui -o Ui_MainWindow.py 预先生成，启动时无需解析.ui文件
+    from Ui_MainWindow import Ui_Form
+except ImportError:
+    Ui_Form = None
 
 class MainWindow(QtWidgets.QWidget):
-    def __init__(self):
-        """初始化主窗口"""
+    # 行情标签刷新间隔（毫秒）
+    LABEL_REFRESH_INTERVAL = 500
+
+    def __init__(self, recorder=None, data_source=None, alert_engine=None, diagnostics_path=None, provider=None,
+                 settings=None, analytics=None):
+        """初始化主窗口
+
+        recorder为可选的TickRecorder，用于将行情持久化到磁盘；data_source为行情数据源，
+        默认为实时的StockFuturesMonitor，也可以传入ReplaySource离线回放。数据源外面包一层
+        共享缓存，其他使用同一数据源的组件可以通过self.data_source共享请求结果。
+        alert_engine为价格提醒引擎，每批行情返回后计算一次，触发的提醒通过托盘消息显示。
+        diagnostics_path为按Shift+F12导出各阶段耗时统计的文件，默认按时间生成文件名。
+        provider为行情提供者，默认按刷新时间轮询数据源，也可以传入StreamingQuoteProvider接收推送行情。
+        settings为程序设置，默认读取用户配置目录下的config.json。
+        analytics为逐笔衍生指标（VWAP、EMA、波动率及品种间价差），价差可以作为代码加入自选列表，
+        也可以在提醒规则中用价差名称作为symbol。
+        """
         super().__init__()
-        # 使用self.resource_path调用成员函数
-        ui_file = self.resource_path('MainWindow.ui')
-        uic.loadUi(ui_file, self)
+        # 程序设置只在启动时读取一次，修改后延迟写入，退出前写入尚未保存的修改
+        self.settings = settings if settings is not None else Settings(legacy_paths=self.legacy_config_paths())
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.save_geometry)
+            app.aboutToQuit.connect(self.settings.flush)
+        self.data_source = QuoteCache(data_source if data_source is not None else StockFuturesMonitor)
+        self.provider = provider if provider is not None else PollingQuoteProvider(self.data_source)
+        self.setup_ui()
 
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint)
         self.widget_2.hide()
@@ -23,6 +64,29 @@ class MainWindow(QtWidgets.QWidget):
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.on_timer_timeout)
 
+        # 行情提供者在后台线程中获取或接收行情，通过订阅对象转到GUI线程
+        self.subscription = QuoteSubscription(self.provider, self)
+        self.subscription.quotesReady.connect(self.on_quotes_ready)
+        # 最近一次成功获取行情的时间戳及显示文本
+        self._last_quote_time = None
+        self._last_quote_text = ""
+        # 每个代码的逐笔行情及K线，容量固定
+        self.history = TickHistory()
+        self.recorder = recorder
+        # 多代码自选列表，首次使用时创建
+        self.watchlist_model = None
+        self.watchlist_view = None
+        # 价格提醒规则
+        self.alert_engine = alert_engine if alert_engine is not None else AlertEngine()
+        self.analytics = analytics if analytics is not None else Analytics()
+        # 单代码模式下当前显示的新浪代码，用于在提示中显示衍生指标
+        self._last_quote_symbol = None
+        # 各阶段耗时统计，F12显示/隐藏
+        self.diagnostics_path = diagnostics_path
+        self.diagnostics_view = None
+        # (控件, 收到数据的时刻)：最近一批数据改变了显示、尚未绘制的控件
+        self._repaint_pending = None
+
         # 限制lineEdit_2只能输入正浮点数
         validator = QtGui.QDoubleValidator(0.0, float('inf'), 2)
         validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
@@ -34,9 +98,11 @@ class MainWindow(QtWidgets.QWidget):
         self.radioButton.toggled.connect(self.on_radioButton_toggled)
         self.radioButton_2.toggled.connect(self.on_radioButton_2_toggled)
         self.radioButton.setChecked(True)
+        self.restore_settings()
 
         self.lineEdit.installEventFilter(self)
         self.lineEdit_2.installEventFilter(self)
+        self.label_3.installEventFilter(self)
         self.pushButton.clicked.connect(self.onPushButtonClicked)
         self.pushButton_2.clicked.connect(self.onPushButton2Clicked)
         self._is_dragging = False
@@ -47,6 +113,71 @@ class MainWindow(QtWidgets.QWidget):
         self.pushButton_4.clicked.connect(self.change_font_color)
         self.load_color_settings()
 
+        # 窗口显示后再在后台创建网络会话（导入requests较慢），首次刷新时无需等待
+        QtCore.QTimer.singleShot(0, self.preload_network)
+
+    def setup_ui(self):
+        """创建界面控件
+
+        优先使用预先生成的Ui_MainWindow；尚未生成，或开发时MainWindow.ui比生成的代码新时，
+        改为用uic.loadUi直接加载.ui文件。两种方式的控件都作为窗口的属性访问。
+        """
+        # 使用self.resource_path调用成员函数
+        ui_file = self.resource_path('MainWindow.ui')
+        if Ui_Form is not None and not self.is_ui_file_newer(ui_file):
+            ui = Ui_Form()
+            ui.setupUi(self)
+            self.__dict__.update(vars(ui))
+        else:
+            from PyQt5 import uic
+            uic.loadUi(ui_file, self)
+
+    @staticmethod
+    def is_ui_file_newer(ui_file):
+        """开发环境中.ui文件是否比生成的Ui_MainWindow.py新，打包后总是使用生成的代码"""
+        if getattr(sys, 'frozen', False):
+            return False
+        try:
+            import Ui_MainWindow
+            return os.path.getmtime(ui_file) > os.path.getmtime(Ui_MainWindow.__file__)
+        except OSError:
+            return False
+
+    def preload_network(self):
+        """在后台线程中创建共享的网络会话"""
+        if getattr(self.data_source, 'live', True) and not self.provider.push:
+            threading.Thread(target=SinaSession.shared, name='SinaSessionPreload', daemon=True).start()
+
+    def legacy_config_paths(self):
+        """旧版本保存config.json的位置：开发时为当前目录，打包后为程序所在目录"""
+        paths = [self.resource_path('config.json')]
+        if getattr(sys, 'frozen', False):
+            paths.append(os.path.join(os.path.dirname(sys.executable), 'config.json'))
+        return paths
+
+    def restore_settings(self):
+        """恢复上次使用的代码、刷新时间和窗口位置大小，代码和刷新时间作为输入框的占位符"""
+        if self.settings.get('futures'):
+            self.radioButton_2.setChecked(True)
+        if self.settings.get('codes'):
+            self.lineEdit.setPlaceholderText(self.settings.get('codes'))
+        if self.settings.get('refresh_interval'):
+            self.lineEdit_2.setPlaceholderText(self.settings.get('refresh_interval'))
+        geometry = self.settings.get('window_geometry')
+        # restoreGeometry会把已不在任何屏幕上的窗口移回可见区域
+        if geometry and self.restoreGeometry(QtCore.QByteArray.fromBase64(geometry.encode('ascii'))):
+            return
+        position = self.settings.get('window_position')
+        if isinstance(position, list) and len(position) == 2 and all(isinstance(v, int) for v in position):
+            point = QtCore.QPoint(*position)
+            # 显示器配置变化后原位置可能已不在任何屏幕上
+            if QtWidgets.QApplication.screenAt(point) is not None:
+                self.move(point)
+
+    def save_geometry(self):
+        """记住窗口位置和大小，由设置对象延迟写入"""
+        self.settings.set('window_geometry', bytes(self.saveGeometry().toBase64()).decode('ascii'))
+
     def resource_path(self, relative_path):
         """获取资源文件的绝对路径，支持PyInstaller打包"""
         try:
@@ -77,6 +208,17 @@ class MainWindow(QtWidgets.QWidget):
         if event.type() == QtCore.QEvent.FocusIn:
             if obj in [self.lineEdit, self.lineEdit_2]:
                 obj.clear()
+        elif (event.type() == QtCore.QEvent.Paint and self._repaint_pending is not None
+              and obj is self._repaint_pending[0]):
+            # 由过滤器直接完成绘制，记录从收到数据到该控件绘制完成的耗时
+            start = self._repaint_pending[1]
+            self._repaint_pending = None
+            if self.watchlist_view is not None and obj is self.watchlist_view.viewport():
+                self.watchlist_view.viewportEvent(event)
+            else:
+                obj.event(event)
+            Diagnostics.record('repaint', time.perf_counter() - start)
+            return True
         return super().eventFilter(obj, event)
 
     def mousePressEvent(self, event):
@@ -93,7 +235,9 @@ class MainWindow(QtWidgets.QWidget):
             event.accept()
 
     def mouseReleaseEvent(self, event):
-        """处理鼠标释放事件，结束拖动窗口"""
+        """处理鼠标释放事件，结束拖动窗口并记住窗口位置"""
+        if self._is_dragging:
+            self.save_geometry()
         self._is_dragging = False
         event.accept()
 
@@ -108,12 +252,27 @@ class MainWindow(QtWidgets.QWidget):
         if text == "":
             text = self.lineEdit_2.placeholderText()
 
+        self._last_quote_time = None
+        self._last_quote_text = ""
+        self.label_3.setText("加载数据中")
         try:
             timeRefreshesValue = float(text)
-            self.timer.start(int(timeRefreshesValue * 1000))
         except ValueError:
             # 如果转换失败，使用默认值1秒
-            self.timer.start(1000)
+            timeRefreshesValue = 1.0
+            text = ""
+        # 记住本次监控的代码和刷新时间，下次启动时作为默认值
+        self.settings.update(codes=','.join(self.get_watch_codes()), futures=self.radioButton_2.isChecked(),
+                             refresh_interval=text)
+        # 刷新时间作为轮询的基础间隔，由提供者的调度器决定哪些代码到期；推送源忽略刷新时间
+        self.provider.set_interval(timeRefreshesValue)
+        # 先建好自选列表再开始获取，第一批行情（推送源连接时的快照）不会因列表尚未创建而丢失
+        codes = self.get_watch_codes()
+        self.update_view(codes)
+        self.update_subscription(codes)
+        self.provider.start()
+        # 定时器只负责跟踪代码变化和刷新数据的陈旧程度
+        self.timer.start(self.LABEL_REFRESH_INTERVAL)
 
     def onPushButton2Clicked(self):
         """处理第二个按钮点击事件，隐藏第二个窗口并停止定时器"""
@@ -125,6 +284,7 @@ class MainWindow(QtWidgets.QWidget):
             self.widget_2.hide()
             self.widget.show()
             self.timer.stop()
+            self.provider.stop()
         elif event.key() == QtCore.Qt.Key_Up:
             # 上箭头提升不透明度
             self._opacity = min(1.0, self._opacity + 0.1)
@@ -133,42 +293,256 @@ class MainWindow(QtWidgets.QWidget):
             # 下箭头降低不透明度
             self._opacity = max(0, self._opacity - 0.1)
             self.setWindowOpacity(self._opacity)
+        elif event.key() == QtCore.Qt.Key_F12:
+            # 隐藏快捷键：F12显示/隐藏耗时统计，Shift+F12导出到文件
+            if event.modifiers() & QtCore.Qt.ShiftModifier:
+                self.dump_diagnostics()
+            else:
+                self.toggle_diagnostics_view()
 
-    def on_timer_timeout(self):
-        """定时器超时事件处理"""
-        self.resize(100, 30)
+    def get_watch_codes(self):
+        """获取lineEdit中的代码列表，多个代码以逗号或空格分隔"""
         text = self.lineEdit.text().strip()
         if text == "":
             text = self.lineEdit.placeholderText()
+        return [code for code in re.split(r'[,，\s]+', text) if code]
+
+    def create_watchlist_view(self):
+        """创建自选列表表格，放在行情标签下方"""
+        self.watchlist_model = WatchlistModel(history=self.history, parent=self, analytics=self.analytics)
+        self.watchlist_view = QtWidgets.QTableView(self.widget_2)
+        self.watchlist_view.setModel(self.watchlist_model)
+        self.watchlist_view.setItemDelegateForColumn(WatchlistModel.COL_SPARKLINE, SparklineDelegate(self.watchlist_view))
+        self.watchlist_view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.watchlist_view.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.watchlist_view.setShowGrid(False)
+        self.watchlist_view.setWordWrap(False)
+        # 固定行高和列宽，刷新时不需要重新计算布局
+        self.watchlist_view.verticalHeader().hide()
+        self.watchlist_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.watchlist_view.verticalHeader().setDefaultSectionSize(20)
+        self.watchlist_view.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        for column, width in enumerate((70, 80, 70, 60, 65, 80)):
+            self.watchlist_view.setColumnWidth(column, width)
+        self.widget_2.layout().addWidget(self.watchlist_view, 1, 0)
+        self.watchlist_view.viewport().installEventFilter(self)
+
+    def get_code_symbols(self, codes):
+        """返回 {代码: 新浪代码}，单个代码时按单选按钮区分股票和期货"""
+        if len(codes) == 1 and self.radioButton_2.isChecked():
+            return {codes[0]: f"hf_{codes[0].upper()}"}
+        if len(codes) == 1:
+            exchange_prefix = StockFuturesMonitor.get_exchange_prefix(codes[0])
+            return {codes[0]: f"{exchange_prefix}{codes[0]}"}
+        return {code: StockFuturesMonitor.get_sina_symbol(code) for code in codes}
+
+    def get_subscription(self, codes):
+        """需要订阅的 {代码: 新浪代码}：自选代码中的价差由其两条腿计算，不直接订阅"""
+        subscription = self.get_code_symbols([code for code in codes if not self.analytics.is_spread(code)])
+        # 价差的两条腿即使不在自选列表中也需要订阅，以新浪代码本身作为代码
+        subscribed = set(subscription.values())
+        for spread in self.analytics.spreads():
+            for symbol in (spread.symbol_a, spread.symbol_b):
+                if symbol not in subscribed:
+                    subscription[symbol] = symbol
+                    subscribed.add(symbol)
+        return subscription
+
+    def update_subscription(self, codes):
+        """按代码列表更新订阅，订阅变化时释放不再关注的代码的逐笔历史"""
+        subscription = self.get_subscription(codes)
+        if self.provider.subscribe(subscription):
+            keep = set(subscription.values())
+            keep.update(spread.name for spread in self.analytics.spreads())
+            self.history.retain(keep)
 
-        if self.radioButton.isChecked():
-            stockData = StockFuturesMonitor.get_stock_data(text)
-
-            if 'error' in stockData:
-                QtWidgets.QMessageBox.warning(self, "错误", stockData['error'])
-                esc_event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Escape, QtCore.Qt.NoModifier)
-                self.keyPressEvent(esc_event)
-
-            else:
-                current_price = stockData['current_price']
-                change_amount = stockData['change_amount']
-                change_percent = stockData['change_percent']
-
-                self.label_3.setText(f" {current_price:.3f}  {change_amount:.3f}  {change_percent:.5f}%")
-
-        elif self.radioButton_2.isChecked():
-            futuresData = StockFuturesMonitor.get_futures_data(text)
-
-            if 'error' in futuresData:
-                QtWidgets.QMessageBox.warning(self, "错误", futuresData['error'])
-                esc_event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Escape, QtCore.Qt.NoModifier)
-                self.keyPressEvent(esc_event)
-            else:
-                current_price = futuresData['current_price']
-                change_amount = futuresData['change_amount']
-                change_percent = futuresData['change_percent']
+    def on_timer_timeout(self):
+        """定时器超时事件处理，代码变化时更新显示和订阅，并刷新数据的陈旧程度"""
+        codes = self.get_watch_codes()
+        self.update_view(codes)
+        self.update_subscription(codes)
+        self.update_quote_label()
+
+    def update_view(self, codes):
+        """多个代码时显示自选列表，单个代码时只显示行情标签"""
+        if len(codes) > 1:
+            # 多个代码时使用自选列表，股票和期货代码可以混合
+            if self.watchlist_view is None:
+                self.create_watchlist_view()
+            if not self.watchlist_view.isVisible() or self.watchlist_model.codes() != codes:
+                self.watchlist_model.set_codes(codes)
+                self.watchlist_view.show()
+                self.resize(450, min(600, 60 + 20 * len(codes)))
+        else:
+            self.resize(100, 30)
+            if self.watchlist_view is not None:
+                self.watchlist_view.hide()
+
+    def on_quotes_ready(self, results, fetched_at):
+        """行情提供者送达一批行情 {代码: 行情字典} 后在GUI线程中更新显示"""
+        # 监控已停止时丢弃迟到的结果
+        if not self.timer.isActive():
+            return
+
+        start = time.perf_counter()
+        # 先增量更新衍生指标，价差作为合成行情与原始行情一起计算提醒和显示
+        quotes = {StockFuturesMonitor.get_data_symbol(data): data
+                  for data in results.values() if 'error' not in data}
+        spreads = self.analytics.update(quotes)
+        quotes.update(spreads)
+        self.check_alerts(quotes)
+
+        codes = self.get_watch_codes()
+        data = None
+        if len(codes) == 1:
+            # 单个代码也可以是价差名称，由本批计算出的价差行情显示
+            data = spreads.get(codes[0]) if self.analytics.is_spread(codes[0]) else results.get(codes[0])
+        # 本批数据改变了显示的控件，用于统计重绘耗时
+        repainted = None
+        if len(codes) > 1:
+            if self.on_watchlist_data_ready(dict(results, **spreads), fetched_at):
+                repainted = self.watchlist_view.viewport()
+        elif data is None:
+            # 代码修改前订阅的代码迟到的结果
+            return
+        elif 'error' in data:
+            esc_event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Escape, QtCore.Qt.NoModifier)
+            self.keyPressEvent(esc_event)
+            QtWidgets.QMessageBox.warning(self, "错误", data['error'])
+            return
+        else:
+            current_price = data['current_price']
+            change_amount = data['change_amount']
+            change_percent = data['change_percent']
+
+            self._last_quote_text = f" {current_price:.3f}  {change_amount:.3f}  {change_percent:.5f}%"
+            self._last_quote_time = fetched_at
+            self._last_quote_symbol = StockFuturesMonitor.get_data_symbol(data)
+            self.record_quote(data, fetched_at)
+            old_text = self.label_3.text()
+            self.update_quote_label()
+            if self.label_3.text() != old_text:
+                repainted = self.label_3
+        Diagnostics.record('ui_update', time.perf_counter() - start)
+        # 显示没有变化或控件不可见时不会重绘，不统计；新的一批数据覆盖尚未绘制的上一批
+        self._repaint_pending = (repainted, start) if repainted is not None and repainted.isVisible() else None
+
+    def diagnostics_text(self):
+        """耗时统计表格及刷新、缓存状态"""
+        lines = [Diagnostics.format_table(), self.provider.status(),
+                 f"合并投递: {self.subscription.merged_batches}"]
+        metrics = self.data_source.metrics()
+        lines.append(f"缓存: 命中率 {metrics['hit_rate']:.0%}，合并请求 {metrics['coalesced']}，"
+                     f"缓存条目 {metrics['entries']}")
+        return '\n'.join(lines)
+
+    def toggle_diagnostics_view(self):
+        """在主窗口下方显示/隐藏耗时统计"""
+        if self.diagnostics_view is None:
+            view = QtWidgets.QLabel(None, QtCore.Qt.Tool | QtCore.Qt.FramelessWindowHint |
+                                    QtCore.Qt.WindowStaysOnTopHint)
+            view.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+            view.setStyleSheet("QLabel { background-color: rgba(0, 0, 0, 200); color: rgb(0, 255, 0); padding: 6px; }")
+            view.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+            self.diagnostics_timer = QtCore.QTimer(self)
+            self.diagnostics_timer.timeout.connect(self.update_diagnostics_view)
+            self.diagnostics_view = view
+        if self.diagnostics_view.isVisible():
+            self.diagnostics_timer.stop()
+            self.diagnostics_view.hide()
+        else:
+            self.update_diagnostics_view()
+            self.diagnostics_view.show()
+            self.diagnostics_timer.start(500)
+
+    def update_diagnostics_view(self):
+        self.diagnostics_view.setText(self.diagnostics_text())
+        self.diagnostics_view.adjustSize()
+        self.diagnostics_view.move(self.frameGeometry().bottomLeft() + QtCore.QPoint(0, 4))
+
+    def dump_diagnostics(self, path=None):
+        """把耗时统计导出为JSON文件，返回文件路径"""
+        path = path or self.diagnostics_path or time.strftime('diagnostics-%Y%m%d-%H%M%S.json')
+        extra = {'provider': self.provider.status(), 'merged_batches': self.subscription.merged_batches,
+                 'cache': self.data_source.metrics()}
+        if getattr(self.data_source, 'live', True) and not self.provider.push:
+            extra['hosts'] = SinaSession.shared().host_health()
+        try:
+            Diagnostics.dump(path, extra)
+        except OSError as e:
+            self.tray_icon.showMessage("导出失败", str(e), QtWidgets.QSystemTrayIcon.Warning, 3000)
+            return None
+        self.tray_icon.showMessage("耗时统计已导出", os.path.abspath(path), QtWidgets.QSystemTrayIcon.Information, 3000)
+        return path
+
+    def on_watchlist_data_ready(self, results, fetched_at):
+        """批量行情（含价差）返回后更新自选列表，单个代码出错时只在该行显示错误，返回变化的行数"""
+        if self.watchlist_model is None:
+            return 0
+        for code, data in results.items():
+            if 'error' not in data:
+                self.record_quote(data, fetched_at)
+        changed = self.watchlist_model.update_quotes(results)
+        self._last_quote_text = f" 共{len(self.watchlist_model.codes())}个代码"
+        self._last_quote_time = fetched_at
+        self._last_quote_symbol = None
+        self.update_quote_label()
+        return changed
+
+    def record_quote(self, data, fetched_at):
+        """把一笔行情写入内存历史，并在启用时写入磁盘记录（价差只保存在内存中）
+
+        时间戳使用行情自身的时间（价差等没有行情时间的使用获取时间）；与上一笔时间和成交量
+        都相同的行情是重复获取的同一笔，不再记录。
+        """
+        symbol = StockFuturesMonitor.get_data_symbol(data)
+        timestamp = quote_timestamp(data.get('update_time')) or fetched_at
+        volume = data.get('volume', 0.0)
+        history = self.history.get(symbol)
+        latest = history.ticks.latest() if history is not None else None
+        if latest is not None and (timestamp < latest[0] or (timestamp == latest[0] and volume == latest[2])):
+            return
+        self.history.record(symbol, timestamp, data['current_price'], volume)
+        if self.recorder is not None and data.get('type') != 'spread':
+            self.recorder.record_quote(symbol, data, timestamp)
+
+    def check_alerts(self, quotes):
+        """用本批行情 {新浪代码: 行情字典} 计算提醒规则，触发时通过托盘消息提示"""
+        if not len(self.alert_engine):
+            return
+        fired = self.alert_engine.evaluate(quotes)
+        if not fired:
+            return
+        lines = [AlertEngine.format_alert(rule, price) for rule, price in fired[:5]]
+        if len(fired) > 5:
+            lines.append(f"等共{len(fired)}条提醒")
+        self.tray_icon.showMessage(
+            "价格提醒",
+            "\n".join(lines),
+            QtWidgets.QSystemTrayIcon.Warning,
+            5000
+        )
 
-                self.label_3.setText(f" {current_price:.3f}  {change_amount:.3f}  {change_percent:.5f}%")
+    def update_quote_label(self):
+        """刷新行情标签，行情提供者认为数据已陈旧时显示已过去的秒数"""
+        if self._last_quote_time is None:
+            return
+        age = time.time() - self._last_quote_time
+        text = self._last_quote_text
+        codes = self.get_watch_codes()
+        code = codes[0] if len(codes) == 1 else None
+        if self.provider.finished:
+            text += "  回放结束"
+        elif code is not None and not self.provider.is_market_open(code):
+            text += "  休市"
+        elif self.provider.is_stale(code, age):
+            text += f"  ({age:.0f}s)"
+        self.label_3.setText(text)
+        tooltip = f"更新于 {time.strftime('%H:%M:%S', time.localtime(self._last_quote_time))}（{age:.1f}秒前）"
+        stats = self.analytics.stats(self._last_quote_symbol) if self._last_quote_symbol else None
+        if stats:
+            tooltip += "\n" + Analytics.format_stats(stats)
+        self.label_3.setToolTip(tooltip)
 
     def create_tray_icon(self):
         """创建系统托盘图标和菜单"""
@@ -269,19 +643,7 @@ class MainWindow(QtWidgets.QWidget):
 
     def change_background_color(self):
         """点击按钮弹出调色板设置背景颜色"""
-        current_color = QtCore.Qt.white
-        # 尝试获取当前背景颜色
-        try:
-            current_style = self.styleSheet()
-            if 'background-color:' in current_style:
-                color_start = current_style.find('background-color:') + len('background-color:')
-                color_end = current_style.find(';', color_start)
-                if color_end == -1:
-                    color_end = len(current_style)
-                color_name = current_style[color_start:color_end].strip()
-                current_color = QtGui.QColor(color_name)
-        except:
-            current_color = QtCore.Qt.white
+        current_color = QtGui.QColor(self.get_current_background_color())
 
         # 创建自定义的QColorDialog
         color_dialog = QtWidgets.QColorDialog(current_color, self)
@@ -293,27 +655,12 @@ class MainWindow(QtWidgets.QWidget):
         if color_dialog.exec_() == QtWidgets.QDialog.Accepted:
             color = color_dialog.currentColor()
             # 保持原有的字体颜色，只改变背景颜色
-            font_color = self.get_current_font_color()
-            new_style = f"background-color: {color.name()}; color: {font_color};"
-            self.setStyleSheet(new_style)
             self.save_color_settings(background_color=color.name())
+            self.load_color_settings()
 
     def change_font_color(self):
         """点击按钮弹出调色板设置字体颜色"""
-        current_color = QtCore.Qt.black
-        # 尝试获取当前字体颜色
-        try:
-            current_style = self.styleSheet()
-            if 'color:' in current_style:
-                # 查找字体颜色（不是背景颜色）
-                parts = current_style.split(';')
-                for part in parts:
-                    if 'color:' in part and 'background-color:' not in part:
-                        color_name = part.split('color:')[1].strip()
-                        current_color = QtGui.QColor(color_name)
-                        break
-        except:
-            current_color = QtCore.Qt.black
+        current_color = QtGui.QColor(self.get_current_font_color())
 
         # 创建自定义的QColorDialog
         color_dialog = QtWidgets.QColorDialog(current_color, self)
@@ -325,74 +672,32 @@ class MainWindow(QtWidgets.QWidget):
         if color_dialog.exec_() == QtWidgets.QDialog.Accepted:
             color = color_dialog.currentColor()
             # 保持原有的背景颜色，只改变字体颜色
-            background_color = self.get_current_background_color()
-            new_style = f"background-color: {background_color}; color: {color.name()};"
-            self.setStyleSheet(new_style)
             self.save_color_settings(font_color=color.name())
+            self.load_color_settings()
 
     def get_current_background_color(self):
         """获取当前背景颜色"""
-        try:
-            current_style = self.styleSheet()
-            if 'background-color:' in current_style:
-                color_start = current_style.find('background-color:') + len('background-color:')
-                color_end = current_style.find(';', color_start)
-                if color_end == -1:
-                    color_end = len(current_style)
-                return current_style[color_start:color_end].strip()
-        except:
-            pass
-        return '#ffffff'  # 默认白色
+        return self.settings.get('background_color')
 
     def get_current_font_color(self):
         """获取当前字体颜色"""
-        try:
-            current_style = self.styleSheet()
-            if 'color:' in current_style:
-                parts = current_style.split(';')
-                for part in parts:
-                    if 'color:' in part and 'background-color:' not in part:
-                        return part.split('color:')[1].strip()
-        except:
-            pass
-        return '#000000'  # 默认黑色
+        return self.settings.get('font_color')
 
     def save_color_settings(self, background_color=None, font_color=None):
-        """保存颜色设置到配置文件"""
-        try:
-            import json
-            config_file = self.resource_path('config.json')
-
-            # 读取现有配置
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            except FileNotFoundError:
-                config = {}
-
-            # 更新颜色设置
-            if background_color:
-                config['background_color'] = background_color
-            if font_color:
-                config['font_color'] = font_color
-
-            # 保存配置
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存颜色设置失败: {e}")
+        """保存颜色设置，由设置对象延迟写入配置文件"""
+        values = {}
+        if background_color:
+            values['background_color'] = background_color
+        if font_color:
+            values['font_color'] = font_color
+        self.settings.update(**values)
 
     def load_color_settings(self):
-        """从配置文件加载颜色设置"""
-        try:
-            import json
-            config_file = self.resource_path('config.json')
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                background_color = config.get('background_color', '#ffffff')
-                font_color = config.get('font_color', '#000000')
-                style = f"background-color: {background_color}; color: {font_color};"
-                self.setStyleSheet(style)
-        except Exception:
-            # 如果加载失败，使用默认颜色
-            self.setStyleSheet("background-color: #ffffff; color: #000000;")
\ No newline at end of file
+        """按颜色设置更新窗口样式，设置中的颜色无效时使用默认颜色"""
+        background_color = self.get_current_background_color()
+        font_color = self.get_current_font_color()
+        if not QtGui.QColor.isValidColor(background_color):
+            background_color = Settings.DEFAULTS['background_color']
+        if not QtGui.QColor.isValidColor(font_color):
+            font_color = Settings.DEFAULTS['font_color']
+        self.setStyleSheet(f"background-color: {background_color}; color: {font_color};")
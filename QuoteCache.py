@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from StockFuturesMonitor import StockFuturesMonitor
+
+
+class _Pending:
+    """一个进行中的请求，其他等待同一代码的调用方在此等待结果"""
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class QuoteCache:
+    """带TTL和LRU淘汰的共享行情缓存
+
+    接口与StockFuturesMonitor相同，可以放在任何数据源前面。缓存以新浪代码为键，
+    同一代码的并发请求（如主窗口、自选列表和提醒引擎同时刷新）合并为一次网络请求。
+    错误结果不缓存。返回的行情字典被多个调用方共享，调用方不应修改。
+    有效期按墙上时间计算，回放等非实时数据源的时钟与墙上时间不同步，不缓存，只合并并发请求。
+    """
+    DEFAULT_TTL = 0.5
+
+    def __init__(self, source=StockFuturesMonitor, ttl=DEFAULT_TTL, max_entries=4096, clock=time.monotonic):
+        self.source = source
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.live = getattr(source, 'live', True)
+        if not self.live:
+            self.ttl = 0.0
+        self._clock = clock
+        # 新浪代码 -> (过期时间, 行情字典)，按最近使用排序
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def finished(self):
+        """数据源是否已播放完毕（回放数据源），实时数据源总是False"""
+        return getattr(self.source, 'finished', False)
+
+    def metrics(self):
+        """命中、未命中、合并请求和淘汰次数"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+    def invalidate(self, symbol=None):
+        """清除某个新浪代码的缓存，不指定时清空全部"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def _lookup(self, key, now):
+        """在锁内查找缓存，返回 (行情字典, None) 或 (None, 进行中的请求, 是否由本调用方发起)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], None, False
+            del self._entries[key]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return None, pending, False
+        pending = self._inflight[key] = _Pending()
+        self.misses += 1
+        return None, pending, True
+
+    def _store(self, key, pending, data):
+        """在锁内保存结果并唤醒等待者"""
+        if 'error' not in data and self.ttl > 0:
+            self._entries[key] = (self._clock() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        del self._inflight[key]
+        pending.result = data
+        pending.event.set()
+
+    def _get(self, key, loader):
+        with self._lock:
+            data, pending, owner = self._lookup(key, self._clock())
+        if data is not None:
+            return data
+        if not owner:
+            pending.event.wait()
+            return pending.result
+        try:
+            data = loader()
+        except Exception as e:
+            data = {'error': f"获取数据时出错: {e}"}
+        with self._lock:
+            self._store(key, pending, data)
+        return data
+
+    def get_stock_data(self, stock_code):
+        key = f"{StockFuturesMonitor.get_exchange_prefix(stock_code)}{stock_code}"
+        return self._get(key, lambda: self.source.get_stock_data(stock_code))
+
+    def get_futures_data(self, futures_code):
+        key = f"hf_{futures_code.upper()}"
+        return self._get(key, lambda: self.source.get_futures_data(futures_code))
+
+    def get_batch_data(self, codes, max_url_length=None):
+        """批量获取，缓存未命中的代码合并为一次批量请求"""
+        results, symbol_codes = StockFuturesMonitor.group_codes(codes)
+        owned = {}
+        waiting = {}
+        now = self._clock()
+        with self._lock:
+            for symbol, symbol_code_list in symbol_codes.items():
+                data, pending, owner = self._lookup(symbol, now)
+                if data is not None:
+                    for code in symbol_code_list:
+                        results[code] = data
+                elif owner:
+                    owned[symbol] = pending
+                else:
+                    waiting[symbol] = pending
+
+        if owned:
+            fetch_codes = [symbol_codes[symbol][0] for symbol in owned]
+            try:
+                fetched = self.source.get_batch_data(fetch_codes, max_url_length)
+            except Exception as e:
+                fetched = {code: {'error': f"批量获取数据时出错: {e}"} for code in fetch_codes}
+            with self._lock:
+                for symbol, pending in owned.items():
+                    data = fetched.get(symbol_codes[symbol][0]) or {'error': "获取数据失败，可能是代码错误"}
+                    self._store(symbol, pending, data)
+                    for code in symbol_codes[symbol]:
+                        results[code] = data
+
+        for symbol, pending in waiting.items():
+            pending.event.wait()
+            for code in symbol_codes[symbol]:
+                results[code] = pending.result
+        return results
@@ -0,0 +1,62 @@
+import threading
+import time
+from PyQt5 import QtCore, QtWidgets
+from Diagnostics import Diagnostics
+
+
+class QuoteSubscription(QtCore.QObject):
+    """把行情提供者在后台线程中送达的行情转到GUI线程
+
+    界面来不及处理时，后续到达的行情与尚未处理的行情合并（同一代码保留最新一笔），
+    GUI线程每次取走合并后的全部结果，推送频繁时不会在事件队列中堆积。
+    """
+    # {代码: 行情字典}, 最新一批行情的完成时间戳
+    quotesReady = QtCore.pyqtSignal(object, float)
+    _pendingReady = QtCore.pyqtSignal()
+
+    def __init__(self, provider, parent=None):
+        super().__init__(parent)
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._pending = None
+        self._pending_time = 0.0
+        # 最早一批未处理行情的完成时间，用于统计投递耗时
+        self._pending_since = 0.0
+        # 因界面未及时处理而被合并的批次数
+        self.merged_batches = 0
+        # 自定义信号从非Qt线程发出时按队列连接投递到本对象所在的GUI线程
+        self._pendingReady.connect(self._on_pending_ready, QtCore.Qt.QueuedConnection)
+        provider.add_listener(self._on_provider_quotes)
+
+        # 程序退出前停止行情提供者的后台线程
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(provider.stop)
+
+    def _on_provider_quotes(self, results, fetched_at):
+        """行情提供者的监听函数（在后台线程中执行）"""
+        with self._lock:
+            scheduled = self._pending is not None
+            if scheduled:
+                self._pending.update(results)
+                self.merged_batches += 1
+            else:
+                self._pending = dict(results)
+                self._pending_since = fetched_at
+            self._pending_time = fetched_at
+        if not scheduled:
+            self._pendingReady.emit()
+
+    def _on_pending_ready(self):
+        with self._lock:
+            results, fetched_at, since = self._pending, self._pending_time, self._pending_since
+            self._pending = None
+        if results is None:
+            return
+        # 结果从后台线程投递到GUI线程的等待时间，界面线程繁忙时会变长
+        Diagnostics.record('dispatch', max(0.0, time.time() - since))
+        self.quotesReady.emit(results, fetched_at)
+
+    def close(self):
+        self.provider.remove_listener(self._on_provider_quotes)
+        self.provider.stop()
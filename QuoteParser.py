@@ -0,0 +1,267 @@
+import calendar
+import re
+import time
+from array import array
+
+# NumPy为可选依赖，首次使用时才导入，以免拖慢程序启动；缺失时使用array模块
+_numpy = None
+_numpy_loaded = False
+
+
+def load_numpy():
+    """按需导入NumPy，未安装时返回None"""
+    global _numpy, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+        _numpy_loaded = True
+    return _numpy
+
+# 匹配响应中的每一行 var hq_str_xxx="...";
+HQ_LINE_PATTERN = re.compile(r'var hq_str_([^=\s]+)="([^"]*)"')
+# 新浪行情中的日期时间为北京时间（UTC+8，无夏令时）
+BEIJING_OFFSET = 8 * 3600
+# 最近一次转换的 (日期字符串, 当日零点的时间戳)，同一批行情通常属于同一天
+_last_day = (None, 0)
+
+
+class Quote:
+    """紧凑的行情记录，只保存显示和分析需要的字段"""
+    __slots__ = ('symbol', 'code', 'kind', 'name', 'price', 'prev_close',
+                 'open', 'high', 'low', 'time', 'bid', 'ask', 'volume', 'turnover', 'open_interest')
+
+    def __init__(self, symbol, code, kind, name, price, prev_close, open, high, low, time,
+                 bid=0.0, ask=0.0, volume=0.0, turnover=0.0, open_interest=0.0):
+        self.symbol = symbol
+        self.code = code
+        self.kind = kind
+        self.name = name
+        self.price = price
+        self.prev_close = prev_close
+        self.open = open
+        self.high = high
+        self.low = low
+        self.time = time
+        self.bid = bid
+        self.ask = ask
+        self.volume = volume
+        self.turnover = turnover
+        self.open_interest = open_interest
+
+    @property
+    def change_amount(self):
+        return self.price - self.prev_close
+
+    @property
+    def change_percent(self):
+        if not self.prev_close:
+            return 0.0
+        return (self.price - self.prev_close) / self.prev_close * 100
+
+    def to_dict(self):
+        """转换为StockFuturesMonitor.get_stock_data/get_futures_data返回的字典格式"""
+        price = self.price
+        prev_close = self.prev_close
+        change_amount = price - prev_close
+        change_percent = change_amount / prev_close * 100 if prev_close else 0.0
+        if self.kind == 'futures':
+            return {
+                'type': 'futures', 'futures_code': self.code, 'futures_name': self.name,
+                'current_price': price, 'yesterday_close': prev_close, 'open_price': self.open,
+                'high_price': self.high, 'low_price': self.low, 'change_amount': change_amount,
+                'change_percent': change_percent, 'update_time': self.time, 'bid_price': self.bid,
+                'ask_price': self.ask, 'open_interest': self.open_interest, 'volume': self.volume
+            }
+        return {
+            'type': 'stock', 'stock_code': self.code, 'stock_name': self.name,
+            'current_price': price, 'yesterday_close': prev_close, 'open_price': self.open,
+            'high_price': self.high, 'low_price': self.low, 'change_amount': change_amount,
+            'change_percent': change_percent, 'update_time': self.time, 'bid_price': self.bid,
+            'ask_price': self.ask, 'volume': self.volume, 'turnover': self.turnover
+        }
+
+    def __repr__(self):
+        return f"Quote({self.symbol!r}, price={self.price!r}, prev_close={self.prev_close!r}, time={self.time!r})"
+
+
+def _safe_float(val):
+    try:
+        return float(val)
+    except ValueError:
+        return 0.0
+
+
+def parse_payload(symbol, payload):
+    """解析单个代码的引号内字段，格式错误或代码不存在时返回None
+
+    买卖价、成交量、成交额、持仓量等辅助字段格式错误时按0处理。
+    """
+    if symbol.startswith('hf_'):
+        # 外盘期货：0现价 2买价 3卖价 4最高 5最低 6时间 7昨结算 8开盘 9持仓量 12日期 13名称 14成交量
+        # 与A股一致，时间为 "日期 时间"，缺少日期时只有时间
+        fields = payload.split(',', 15)
+        if len(fields) <= 13:
+            return None
+        return Quote(symbol, symbol[3:], 'futures', fields[13], _safe_float(fields[0]),
+                     _safe_float(fields[7]), _safe_float(fields[8]), _safe_float(fields[4]),
+                     _safe_float(fields[5]), f"{fields[12]} {fields[6]}" if fields[12] else fields[6],
+                     _safe_float(fields[2]), _safe_float(fields[3]),
+                     _safe_float(fields[14]) if len(fields) > 14 else 0.0, 0.0, _safe_float(fields[9]))
+
+    # A股：0名称 1开盘 2昨收 3现价 4最高 5最低 6买一价 7卖一价 8成交量（股） 9成交额（元）
+    # 10-29五档盘口 30日期 31时间，共至少32个字段
+    if payload.count(',') < 31:
+        return None
+    fields = payload.split(',', 10)
+    try:
+        price = float(fields[3])
+        prev_close = float(fields[2])
+        open_price = float(fields[1])
+        high = float(fields[4])
+        low = float(fields[5])
+    except ValueError:
+        return None
+    tail = fields[10].split(',')
+    # tail[0]对应第10个字段，日期和时间位于第30、31个字段
+    return Quote(symbol, symbol[2:], 'stock', fields[0], price, prev_close, open_price, high,
+                 low, f"{tail[20]} {tail[21]}", _safe_float(fields[6]), _safe_float(fields[7]),
+                 _safe_float(fields[8]), _safe_float(fields[9]))
+
+
+def quote_timestamp(update_time):
+    """把行情时间 'YYYY-MM-DD HH:MM:SS'（北京时间）转换为Unix时间戳，格式不符时返回None"""
+    global _last_day
+    if not update_time or len(update_time) != 19:
+        return None
+    day, day_start = _last_day
+    try:
+        if update_time[:10] != day:
+            day = update_time[:10]
+            day_start = calendar.timegm(time.strptime(day, '%Y-%m-%d')) - BEIJING_OFFSET
+            _last_day = (day, day_start)
+        return (day_start + int(update_time[11:13]) * 3600 + int(update_time[14:16]) * 60
+                + int(update_time[17:19]))
+    except ValueError:
+        return None
+
+
+def format_quote_time(timestamp):
+    """quote_timestamp的逆转换，返回北京时间 'YYYY-MM-DD HH:MM:SS'"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp + BEIJING_OFFSET))
+
+
+def parse_quotes(text):
+    """一次扫描解析多行响应，返回 {新浪代码: Quote}，无效的行被忽略"""
+    quotes = {}
+    for symbol, payload in HQ_LINE_PATTERN.findall(text):
+        quote = parse_payload(symbol, payload)
+        if quote is not None:
+            quotes[symbol] = quote
+    return quotes
+
+
+class QuoteColumns:
+    """按列存储一组固定代码的行情，每次解析直接写入预分配的数组
+
+    数组在有NumPy时为numpy.ndarray，否则为array.array，行号与symbols的顺序一致。
+    传入buffer（如multiprocessing.shared_memory的buf）时各列直接建立在该缓冲区上，
+    布局为各列float64依次排列、最后为每行一个字节的valid，大小见buffer_size；
+    此时没有NumPy的列为memoryview。
+    """
+    COLUMNS = ('price', 'prev_close', 'open', 'high', 'low')
+
+    def __init__(self, symbols, use_numpy=None, buffer=None):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        size = len(self.symbols)
+        np = load_numpy() if use_numpy is None or use_numpy else None
+        if buffer is not None:
+            self._attach(buffer, size, np)
+        elif np is not None:
+            for name in self.COLUMNS:
+                setattr(self, name, np.zeros(size, dtype=np.float64))
+            self.valid = np.zeros(size, dtype=np.bool_)
+        else:
+            for name in self.COLUMNS:
+                setattr(self, name, array('d', bytes(8 * size)))
+            self.valid = array('b', bytes(size))
+
+    @classmethod
+    def buffer_size(cls, size):
+        """size行的列存储所需的缓冲区字节数"""
+        return size * (8 * len(cls.COLUMNS) + 1)
+
+    def _attach(self, buffer, size, np):
+        if len(buffer) < self.buffer_size(size):
+            raise ValueError(f"缓冲区大小不足: {len(buffer)} < {self.buffer_size(size)}")
+        view = memoryview(buffer)
+        for i, name in enumerate(self.COLUMNS):
+            offset = 8 * size * i
+            if np is not None:
+                setattr(self, name, np.frombuffer(buffer, dtype=np.float64, count=size, offset=offset))
+            else:
+                setattr(self, name, view[offset:offset + 8 * size].cast('d'))
+        offset = 8 * size * len(self.COLUMNS)
+        if np is not None:
+            self.valid = np.frombuffer(buffer, dtype=np.bool_, count=size, offset=offset)
+        else:
+            self.valid = view[offset:offset + size].cast('b')
+
+    def release(self):
+        """释放对缓冲区的引用，共享内存关闭前需要调用"""
+        for name in self.COLUMNS + ('valid',):
+            column = getattr(self, name, None)
+            if isinstance(column, memoryview):
+                column.release()
+            setattr(self, name, None)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def fill(self, text):
+        """解析响应并写入对应的行，返回成功更新的行数"""
+        index = self.index
+        price, prev_close, open_, high, low = self.price, self.prev_close, self.open, self.high, self.low
+        valid = self.valid
+        updated = 0
+        for symbol, payload in HQ_LINE_PATTERN.findall(text):
+            row = index.get(symbol)
+            if row is None:
+                continue
+            try:
+                if symbol.startswith('hf_'):
+                    if payload.count(',') < 13:
+                        raise ValueError(payload)
+                    fields = payload.split(',', 9)
+                    # 外盘期货的空字段按0处理，与parse_payload一致
+                    price[row] = _safe_float(fields[0])
+                    prev_close[row] = _safe_float(fields[7])
+                    open_[row] = _safe_float(fields[8])
+                    high[row] = _safe_float(fields[4])
+                    low[row] = _safe_float(fields[5])
+                else:
+                    if payload.count(',') < 31:
+                        raise ValueError(payload)
+                    fields = payload.split(',', 6)
+                    price[row] = float(fields[3])
+                    prev_close[row] = float(fields[2])
+                    open_[row] = float(fields[1])
+                    high[row] = float(fields[4])
+                    low[row] = float(fields[5])
+            except ValueError:
+                valid[row] = 0
+                continue
+            valid[row] = 1
+            updated += 1
+        return updated
+
+    def quote(self, row):
+        """取出某一行作为Quote记录（名称和时间不在列存储中）"""
+        symbol = self.symbols[row]
+        kind = 'futures' if symbol.startswith('hf_') else 'stock'
+        code = symbol[3:] if kind == 'futures' else symbol[2:]
+        return Quote(symbol, code, kind, '', float(self.price[row]), float(self.prev_close[row]),
+                     float(self.open[row]), float(self.high[row]), float(self.low[row]), '')
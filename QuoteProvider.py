@@ -0,0 +1,378 @@
+"""行情提供者
+
+QuoteProvider 定义统一的订阅接口：调用方用 subscribe 设置关注的代码，用 add_listener
+注册监听函数，行情以 {代码: 行情字典} 的形式送达。目前有两种实现：
+
+- PollingQuoteProvider：按刷新间隔轮询新浪接口（或任何与StockFuturesMonitor接口一致的数据源）；
+- StreamingQuoteProvider：连接SSE（Server-Sent Events）推送源，行情变化时由服务器推送。
+
+监听函数在提供者的后台线程中调用，界面程序需要自行转到GUI线程。
+"""
+import http.client
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from StockFuturesMonitor import StockFuturesMonitor
+from QuoteParser import parse_quotes
+from RefreshScheduler import RefreshScheduler
+from QuoteCache import QuoteCache
+from Diagnostics import Diagnostics
+
+
+class QuoteProvider:
+    """行情提供者接口"""
+    # 是否为实时行情，回放数据源为False
+    live = True
+    # 是否由服务器推送，推送源不需要刷新间隔
+    push = False
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+        # 代码 -> 新浪代码
+        self._subscription = {}
+        # 回放等有限数据源播放完毕后为True
+        self.finished = False
+
+    def add_listener(self, listener):
+        """注册监听函数 listener(results, fetched_at)，results为 {代码: 行情字典}"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _publish(self, results, fetched_at):
+        for listener in list(self._listeners):
+            try:
+                listener(results, fetched_at)
+            except Exception as e:
+                print(f"行情监听函数出错: {e}")
+
+    def subscription(self):
+        with self._lock:
+            return dict(self._subscription)
+
+    def subscribe(self, code_symbols):
+        """设置关注的代码 {代码: 新浪代码}，返回订阅是否有变化"""
+        code_symbols = dict(code_symbols)
+        with self._lock:
+            if code_symbols == self._subscription:
+                return False
+            self._subscription = code_symbols
+        self._on_subscription_changed(code_symbols)
+        return True
+
+    def _on_subscription_changed(self, code_symbols):
+        pass
+
+    def set_interval(self, interval):
+        """设置刷新间隔（秒），推送源忽略"""
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def is_market_open(self, code):
+        return True
+
+    def is_stale(self, code, age):
+        """距离上次收到该代码的行情已过去age秒时，是否应提示数据陈旧"""
+        return False
+
+    def status(self):
+        """用于诊断信息的状态描述"""
+        return ""
+
+
+class PollingQuoteProvider(QuoteProvider):
+    """按刷新间隔轮询数据源的行情提供者
+
+    在后台线程中运行，由RefreshScheduler决定每轮需要刷新的代码（自适应间隔、交易时段和请求预算），
+    到期代码合并为一次批量请求。新浪代码与自动识别结果不同的代码（如单代码时用户指定了期货）
+    单独按股票或期货接口获取。
+    """
+
+    def __init__(self, data_source=StockFuturesMonitor, interval=1.0):
+        super().__init__()
+        self.data_source = data_source
+        self.live = getattr(data_source, 'live', True)
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        # 每次start加一，旧线程发现编号变化后退出且不再发布结果
+        self._generation = 0
+        # 代码 -> 最近一次发布的行情字典，缓存命中时返回的是同一个对象
+        self._published = {}
+        self.set_interval(interval)
+
+    def set_interval(self, interval):
+        # 回放等非实时数据源不按交易时段暂停，也不限制请求频率
+        scheduler = RefreshScheduler(
+            base_interval=max(interval, 0.01), market_hours=self.live,
+            request_budget=RefreshScheduler.DEFAULT_REQUEST_BUDGET if self.live else None)
+        with self._lock:
+            scheduler.set_symbols(self._subscription)
+            self.scheduler = scheduler
+        # 缓存有效期不超过最短刷新间隔，保证每次刷新都拿到新数据；回放数据源不缓存
+        if isinstance(self.data_source, QuoteCache) and self.live:
+            self.data_source.ttl = min(QuoteCache.DEFAULT_TTL, scheduler.min_interval)
+        self._wake.set()
+
+    def _on_subscription_changed(self, code_symbols):
+        with self._lock:
+            self.scheduler.set_symbols(code_symbols)
+            # 订阅变化后显示方式可能不同，每个代码的下一笔行情都需要重新发布
+            self._published = {}
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        self._generation += 1
+        self._stop = threading.Event()
+        self.finished = False
+        self._thread = threading.Thread(target=self._run, args=(self._generation, self._stop),
+                                        name='PollingQuoteProvider', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止轮询，进行中的请求返回后丢弃其结果，不等待后台线程结束"""
+        self._generation += 1
+        self._stop.set()
+        self._wake.set()
+
+    def _fetch(self, codes, subscription):
+        results = {}
+        batch = []
+        for code in codes:
+            symbol = subscription.get(code)
+            if symbol is None or symbol == StockFuturesMonitor.get_sina_symbol(code):
+                batch.append(code)
+            elif symbol.startswith('hf_'):
+                results[code] = self.data_source.get_futures_data(code)
+            else:
+                results[code] = self.data_source.get_stock_data(code)
+        if batch:
+            results.update(self.data_source.get_batch_data(batch))
+        return results
+
+    def poll_once(self, generation=None):
+        """获取一轮到期的代码并发布，返回结果（没有到期代码时返回None）"""
+        with self._lock:
+            scheduler = self.scheduler
+            subscription = dict(self._subscription)
+            due = scheduler.due()
+        if not due:
+            return None
+        start = time.time()
+        try:
+            results = self._fetch(due, subscription)
+        except Exception as e:
+            results = {code: {'error': f"获取数据时出错: {e}"} for code in due}
+        fetched_at = time.time()
+        Diagnostics.record('fetch', fetched_at - start)
+        if generation is not None and generation != self._generation:
+            return None
+        with self._lock:
+            published = self._published
+            for code in due:
+                data = results.get(code)
+                if data is None or 'error' in data:
+                    scheduler.failed(code)
+                elif data is published.get(code):
+                    # 缓存在有效期内返回了已经发布过的同一笔行情，不作为新的一笔发布，
+                    # 以免提醒引擎按笔数计算的回看窗口中出现重复的行情
+                    del results[code]
+                else:
+                    scheduler.update(code, data['current_price'])
+                    published[code] = data
+        if results:
+            self._publish(results, fetched_at)
+        return results
+
+    def _run(self, generation, stop):
+        while not stop.is_set():
+            self.poll_once(generation)
+            if getattr(self.data_source, 'finished', False):
+                self.finished = True
+                break
+            with self._lock:
+                wait = self.scheduler.next_wakeup()
+                if wait is None:
+                    wait = self.scheduler.min_interval
+            # 休市期间最长等待一分钟后重新检查；订阅或间隔变化、停止时立即唤醒
+            self._wake.wait(min(60.0, max(wait, 0.01)))
+            self._wake.clear()
+
+    def is_market_open(self, code):
+        return self.scheduler.is_market_open(code)
+
+    def is_stale(self, code, age):
+        # 价格不变时调度器会拉长刷新间隔，按该代码当前的间隔判断是否过期
+        interval = self.scheduler.interval(code) if code is not None else None
+        if interval is None:
+            interval = self.scheduler.base_interval
+        return age >= 2 * interval
+
+    def status(self):
+        return f"轮询：基础间隔 {self.scheduler.base_interval:g}秒"
+
+
+class StreamingQuoteProvider(QuoteProvider):
+    """SSE推送行情提供者
+
+    以 GET url?list=代码1,代码2 连接推送源，服务器以 text/event-stream 格式推送，
+    每个事件的data为一行或多行 var hq_str_xxx="..."; （与新浪接口相同的格式），
+    以冒号开头的注释行作为心跳。连接建立后服务器应先推送一次全部代码的快照。
+    订阅变化时重新连接；连接断开时按指数退避加随机抖动重连；超过heartbeat_timeout秒
+    没有收到任何数据（包括心跳）视为连接失效。
+    """
+    push = True
+
+    def __init__(self, url, heartbeat_timeout=15.0, reconnect_delay=0.5, max_reconnect_delay=30.0):
+        super().__init__()
+        self.url = url
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = False
+        self.last_error = None
+        self.last_event_time = None
+        self.events = 0
+        self.reconnects = 0
+        # 新浪代码 -> 代码列表
+        self._symbol_codes = {}
+        self._conn = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def _on_subscription_changed(self, code_symbols):
+        symbol_codes = {}
+        for code, symbol in code_symbols.items():
+            if symbol is not None:
+                symbol_codes.setdefault(symbol, []).append(code)
+        with self._lock:
+            self._symbol_codes = symbol_codes
+        self._wake.set()
+        self._interrupt()
+
+    def _interrupt(self):
+        """关闭当前连接，使读取线程返回并按新的订阅重新连接"""
+        conn = self._conn
+        sock = getattr(conn, 'sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                        name='StreamingQuoteProvider', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._interrupt()
+
+    def _run(self, stop):
+        delay = self.reconnect_delay
+        while not stop.is_set():
+            # 先清除再读取订阅：读取之后发生的订阅变化会重新置位，不会被错过
+            self._wake.clear()
+            with self._lock:
+                symbols = list(self._symbol_codes)
+            if not symbols:
+                self._wake.wait()
+                continue
+            try:
+                self._stream(symbols, stop)
+                # 订阅变化或停止导致的断开立即重连
+                delay = self.reconnect_delay
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                if stop.is_set() or self._wake.is_set():
+                    continue
+                self.last_error = str(e) or type(e).__name__
+            finally:
+                self.connected = False
+                self._conn = None
+            self.reconnects += 1
+            stop.wait(random.uniform(delay / 2, delay))
+            delay = min(self.max_reconnect_delay, delay * 2)
+
+    def _stream(self, symbols, stop):
+        """连接推送源并读取事件，订阅变化或停止时正常返回，连接出错时抛出异常"""
+        parts = urlsplit(self.url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.heartbeat_timeout)
+        self._conn = conn
+        try:
+            start = time.perf_counter()
+            conn.request('GET', f"{parts.path or '/'}?list={','.join(symbols)}",
+                         headers={'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise http.client.HTTPException(f"推送源返回状态码: {response.status}")
+            Diagnostics.record('connect', time.perf_counter() - start)
+            self.connected = True
+            self.last_error = None
+            data_lines = []
+            while not stop.is_set() and not self._wake.is_set():
+                raw = response.readline()
+                if not raw:
+                    if stop.is_set() or self._wake.is_set():
+                        return
+                    raise ConnectionError("推送源关闭了连接")
+                self.last_event_time = time.time()
+                line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                if not line:
+                    # 空行表示一个事件结束
+                    if data_lines:
+                        self._dispatch('\n'.join(data_lines))
+                        data_lines = []
+                    continue
+                if line.startswith(':'):
+                    continue
+                field, _, value = line.partition(':')
+                if field == 'data':
+                    data_lines.append(value[1:] if value.startswith(' ') else value)
+        finally:
+            conn.close()
+
+    def _dispatch(self, text):
+        """解析一个事件并发布给监听函数"""
+        fetched_at = time.time()
+        StockFuturesMonitor.notify_payload(text)
+        start = time.perf_counter()
+        with self._lock:
+            symbol_codes = self._symbol_codes
+        results = {}
+        for symbol, quote in parse_quotes(text).items():
+            for code in symbol_codes.get(symbol, ()):
+                results[code] = quote.to_dict()
+        Diagnostics.record('parse', time.perf_counter() - start)
+        if results:
+            self.events += 1
+            Diagnostics.count('quotes', len(results))
+            self._publish(results, fetched_at)
+
+    def is_stale(self, code, age):
+        # 推送源只在价格变化时发送行情，连接正常（心跳未超时）时不视为陈旧
+        if not self.connected or self.last_event_time is None:
+            return True
+        return time.time() - self.last_event_time >= self.heartbeat_timeout
+
+    def status(self):
+        if self.connected:
+            return f"推送：已连接，事件 {self.events}，重连 {self.reconnects}"
+        return f"推送：未连接（{self.last_error or '连接中'}），重连 {self.reconnects}"
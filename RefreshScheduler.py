@@ -0,0 +1,320 @@
+import datetime
+import math
+import time
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8及以下
+    ZoneInfo = None
+
+
+class USTimeZone(datetime.tzinfo):
+    """按美国现行夏令时规则（2007年起）计算偏移的固定时区，用于系统缺少时区数据时
+
+    夏令时从3月第二个星期日2:00（标准时间）开始，到11月第一个星期日2:00（夏令时间）结束。
+    """
+    HOUR = datetime.timedelta(hours=1)
+
+    def __init__(self, std_hours, std_name, dst_name):
+        self.std_offset = datetime.timedelta(hours=std_hours)
+        self.std_name = std_name
+        self.dst_name = dst_name
+
+    def __repr__(self):
+        return f"USTimeZone({self.std_name}/{self.dst_name})"
+
+    @staticmethod
+    def _first_sunday(year, month, day):
+        """当月day日（含）之后的第一个星期日2:00"""
+        dt = datetime.datetime(year, month, day, 2)
+        return dt + datetime.timedelta(days=6 - dt.weekday())
+
+    def _dst_range(self, year):
+        """当年夏令时的起止时间（当地钟面时间，不带时区）"""
+        return self._first_sunday(year, 3, 8), self._first_sunday(year, 11, 1)
+
+    def dst(self, dt):
+        if dt is None or dt.tzinfo is None:
+            return datetime.timedelta(0)
+        start, end = self._dst_range(dt.year)
+        dt = dt.replace(tzinfo=None)
+        # 开始时跳过的一小时按fold选择，结束时重复的一小时fold=1表示第二次（标准时间）
+        if start + self.HOUR <= dt < end - self.HOUR:
+            return self.HOUR
+        if end - self.HOUR <= dt < end:
+            return datetime.timedelta(0) if dt.fold else self.HOUR
+        if start <= dt < start + self.HOUR:
+            return self.HOUR if dt.fold else datetime.timedelta(0)
+        return datetime.timedelta(0)
+
+    def utcoffset(self, dt):
+        return self.std_offset + self.dst(dt)
+
+    def tzname(self, dt):
+        return self.dst_name if self.dst(dt) else self.std_name
+
+    def fromutc(self, dt):
+        start, end = self._dst_range(dt.year)
+        std_time = (dt + self.std_offset).replace(tzinfo=None)
+        dst_time = std_time + self.HOUR
+        if end <= dst_time < end + self.HOUR:
+            # 重复的一小时中的第二次
+            return std_time.replace(tzinfo=self, fold=1)
+        if start <= std_time and dst_time < end:
+            return dst_time.replace(tzinfo=self)
+        return std_time.replace(tzinfo=self)
+
+
+def _timezone(name, fallback):
+    """获取时区，系统缺少时区数据（如未安装tzdata的Windows）时使用fallback"""
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            pass
+    return fallback
+
+
+class MarketSessions:
+    """一个市场的交易时段
+
+    sessions 为 [(星期几, 开始时间, 结束时间), ...]，星期一为0，时间为当地的 datetime.time，
+    结束时间早于开始时间表示跨越午夜。holidays 为休市日期（当地 datetime.date）的集合。
+    """
+
+    def __init__(self, name, tz, sessions, holidays=()):
+        self.name = name
+        self.tz = tz
+        self.sessions = sessions
+        self.holidays = set(holidays)
+
+    def _intervals(self, day):
+        """返回某个当地日期开始的各交易时段 [(开始datetime, 结束datetime), ...]"""
+        if day in self.holidays:
+            return []
+        result = []
+        for weekday, start, end in self.sessions:
+            if weekday != day.weekday():
+                continue
+            start_dt = datetime.datetime.combine(day, start, self.tz)
+            end_dt = datetime.datetime.combine(day, end, self.tz)
+            if end_dt <= start_dt:
+                end_dt += datetime.timedelta(days=1)
+            result.append((start_dt, end_dt))
+        return result
+
+    def is_open(self, timestamp):
+        now = datetime.datetime.fromtimestamp(timestamp, self.tz)
+        # 前一天开始的时段可能跨越午夜
+        for offset in (-1, 0):
+            day = now.date() + datetime.timedelta(days=offset)
+            for start, end in self._intervals(day):
+                if start <= now < end:
+                    return True
+        return False
+
+    def next_open(self, timestamp, max_days=14):
+        """返回timestamp之后（含）最近一次开市的时间戳，max_days内无交易时段时返回None"""
+        now = datetime.datetime.fromtimestamp(timestamp, self.tz)
+        if self.is_open(timestamp):
+            return timestamp
+        for offset in range(max_days + 1):
+            day = now.date() + datetime.timedelta(days=offset)
+            for start, _ in sorted(self._intervals(day)):
+                if start > now:
+                    return start.timestamp()
+        return None
+
+
+def _weekly(days, *ranges):
+    sessions = []
+    for weekday in days:
+        for start, end in ranges:
+            sessions.append((weekday, datetime.time(*start), datetime.time(*end)))
+    return sessions
+
+
+# 沪深交易所：集合竞价9:15起，午间11:30~13:00休市
+SSE_SZSE = MarketSessions(
+    'SSE/SZSE', _timezone('Asia/Shanghai', datetime.timezone(datetime.timedelta(hours=8), 'Asia/Shanghai')),
+    _weekly(range(5), ((9, 15), (11, 30)), ((13, 0), (15, 0))))
+
+# CME Globex：周日17:00至周五16:00（芝加哥时间），周一至周四16:00~17:00每日维护
+CME_GLOBEX = MarketSessions(
+    'CME Globex', _timezone('America/Chicago', USTimeZone(-6, 'CST', 'CDT')),
+    _weekly((6, 0, 1, 2, 3), ((17, 0), (16, 0))))
+
+
+class SymbolSchedule:
+    """单个代码的调度状态"""
+    __slots__ = ('market', 'interval', 'next_due', 'last_price', 'fetched')
+
+    def __init__(self, market, interval):
+        self.market = market
+        self.interval = interval
+        self.next_due = 0.0
+        self.last_price = None
+        self.fetched = False
+
+
+class RefreshScheduler:
+    """自适应刷新调度器
+
+    - 休市时段（沪深午休、夜间、周末，CME每日维护及周末）暂停刷新，
+      但每个代码首次总会获取一次，以便显示最近的收盘价；
+    - 价格未变化时按backoff倍数逐步拉长该代码的刷新间隔，最长max_interval；
+    - 单次变动幅度超过volatility_threshold时按tighten倍数缩短间隔，最短min_interval；
+    - 所有代码共享每秒request_budget次请求的令牌桶，到期代码按等待时间长短轮流获取，
+      request_budget为None时不限制。
+    """
+    # 每次批量请求能覆盖的代码数量，用于把代码数换算为请求数
+    SYMBOLS_PER_REQUEST = 200
+    # 默认每秒最多请求次数
+    DEFAULT_REQUEST_BUDGET = 5.0
+
+    def __init__(self, base_interval=1.0, min_interval=None, max_interval=30.0, backoff=1.5,
+                 tighten=0.5, volatility_threshold=0.002, request_budget=DEFAULT_REQUEST_BUDGET, market_hours=True,
+                 clock=time.time):
+        self.base_interval = base_interval
+        self.min_interval = min_interval if min_interval is not None else base_interval / 2
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff = backoff
+        self.tighten = tighten
+        self.volatility_threshold = volatility_threshold
+        self.request_budget = request_budget
+        self.market_hours = market_hours
+        self._clock = clock
+        self._symbols = {}
+        self._tokens = request_budget or 0.0
+        self._last_refill = clock()
+
+    @staticmethod
+    def market_of(symbol):
+        """根据新浪代码判断所属市场，无法判断时返回None（视为全天交易）"""
+        if symbol is None:
+            return None
+        if symbol.startswith('hf_'):
+            return CME_GLOBEX
+        if symbol[:2] in ('sh', 'sz'):
+            return SSE_SZSE
+        return None
+
+    def set_symbols(self, symbols):
+        """设置需要调度的代码，symbols为 {代码: 新浪代码}
+
+        已有代码保留其刷新间隔，但都会立即重新获取一次：显示方式可能已经变化（如从自选列表
+        切回单个代码），休市时也需要重新显示最近的收盘价。
+        """
+        old = self._symbols
+        self._symbols = {}
+        for code, symbol in symbols.items():
+            market = self.market_of(symbol)
+            state = old.get(code)
+            if state is None or state.market is not market:
+                state = SymbolSchedule(market, self.base_interval)
+            else:
+                state.fetched = False
+                state.next_due = 0.0
+            self._symbols[code] = state
+
+    def is_market_open(self, code, now=None):
+        state = self._symbols.get(code)
+        if state is None or state.market is None or not self.market_hours:
+            return True
+        return state.market.is_open(self._clock() if now is None else now)
+
+    def _refill(self, now):
+        if self.request_budget is None:
+            return
+        elapsed = max(0.0, now - self._last_refill)
+        self._last_refill = now
+        self._tokens = min(self.request_budget, self._tokens + elapsed * self.request_budget)
+
+    def due(self, now=None):
+        """返回现在需要刷新的代码列表，并从请求预算中扣除相应的请求数"""
+        now = self._clock() if now is None else now
+        self._refill(now)
+        candidates = []
+        for code, state in self._symbols.items():
+            if now < state.next_due:
+                continue
+            if (state.fetched and self.market_hours and state.market is not None
+                    and not state.market.is_open(now)):
+                continue
+            candidates.append((state.next_due, code))
+        if not candidates:
+            return []
+        # 等待最久的代码优先
+        candidates.sort()
+        requests = math.ceil(len(candidates) / self.SYMBOLS_PER_REQUEST)
+        if self.request_budget is not None:
+            requests = min(requests, int(self._tokens))
+            if requests <= 0:
+                return []
+            self._tokens -= requests
+        selected = [code for _, code in candidates[:requests * self.SYMBOLS_PER_REQUEST]]
+        # 请求返回前不再重复选中，返回后由update/failed重新计算
+        for code in selected:
+            state = self._symbols[code]
+            state.next_due = now + state.interval
+        return selected
+
+    def reserve(self, requests, now=None):
+        """为调度器之外的请求（如SnapshotFarm的全市场快照）从请求预算中扣除requests次请求
+
+        返回发出这些请求前需要等待的秒数。预算不足时令牌会变为负数，由之后的时间补足，
+        在此之前due()不会再选出代码，两者共同遵守同一个请求预算。
+        """
+        if self.request_budget is None:
+            return 0.0
+        now = self._clock() if now is None else now
+        self._refill(now)
+        self._tokens -= requests
+        return max(0.0, -self._tokens / self.request_budget)
+
+    def update(self, code, price, now=None):
+        """记录一次成功获取的价格，并据此调整该代码的刷新间隔"""
+        state = self._symbols.get(code)
+        if state is None:
+            return
+        now = self._clock() if now is None else now
+        last = state.last_price
+        if last is not None:
+            if price == last:
+                state.interval = min(self.max_interval, state.interval * self.backoff)
+            elif last and abs(price - last) / abs(last) >= self.volatility_threshold:
+                state.interval = max(self.min_interval, state.interval * self.tighten)
+            else:
+                # 有变化但不剧烈时回到基础间隔
+                state.interval = self.base_interval
+        state.last_price = price
+        state.fetched = True
+        state.next_due = now + state.interval
+
+    def failed(self, code, now=None):
+        """获取失败时按当前间隔稍后重试"""
+        state = self._symbols.get(code)
+        if state is None:
+            return
+        now = self._clock() if now is None else now
+        state.fetched = True
+        state.next_due = now + state.interval
+
+    def interval(self, code):
+        state = self._symbols.get(code)
+        return state.interval if state is not None else None
+
+    def next_wakeup(self, now=None):
+        """距离下一次有代码需要刷新的秒数，没有代码时返回None"""
+        now = self._clock() if now is None else now
+        wakeup = None
+        for state in self._symbols.values():
+            due = state.next_due
+            if self.market_hours and state.market is not None and state.fetched:
+                opens = state.market.next_open(max(due, now))
+                if opens is None:
+                    continue
+                due = max(due, opens)
+            if wakeup is None or due < wakeup:
+                wakeup = due
+        return None if wakeup is None else max(0.0, wakeup - now)
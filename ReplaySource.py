@@ -0,0 +1,211 @@
+import bisect
+import os
+import threading
+import time
+from StockFuturesMonitor import StockFuturesMonitor
+from QuoteParser import parse_payload, format_quote_time
+from TickRecorder import open_segments, SEGMENT_SUFFIX
+
+
+class PayloadRecorder:
+    """把新浪原始响应按行录制到文本文件，供ReplaySource回放
+
+    文件每行格式为 "时间戳<TAB>var hq_str_xxx=\"...\";"，UTF-8编码。
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, timestamp, text):
+        lines = [f"{timestamp:.3f}\t{match.group(0)};\n"
+                 for match in StockFuturesMonitor.HQ_LINE_PATTERN.finditer(text)]
+        with self._lock:
+            self._file.writelines(lines)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplaySource:
+    """离线回放数据源，接口与StockFuturesMonitor一致，可直接替换
+
+    数据来自录制的 hq_str_ 原始响应或TickRecorder的逐笔数据段，回放时钟按
+    speed倍速（常用1~1000倍）推进，每次查询返回回放时刻之前最新的一笔行情。
+    """
+    # 非实时数据源：不受交易时段和请求频率限制
+    live = False
+
+    def __init__(self, speed=1.0, loop=False, clock=time.monotonic):
+        if speed <= 0:
+            raise ValueError("回放速度必须大于0")
+        self.speed = speed
+        self.loop = loop
+        self._clock = clock
+        # 新浪代码 -> (时间戳列表, 数据列表)，数据为加载时解析好的Quote（格式错误时为None）或逐笔行情字典
+        self._series = {}
+        self._start_time = None
+        self._end_time = None
+        self._wall_start = None
+
+    @classmethod
+    def from_payload_file(cls, path, interval=1.0, **kwargs):
+        """从录制的原始响应文件创建，没有时间戳的行按interval秒的间隔依次排列"""
+        source = cls(**kwargs)
+        occurrences = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                timestamp = None
+                head, sep, rest = line.partition('\t')
+                if sep:
+                    try:
+                        timestamp = float(head)
+                        line = rest
+                    except ValueError:
+                        pass
+                for match in StockFuturesMonitor.HQ_LINE_PATTERN.finditer(line):
+                    symbol = match.group(1)
+                    if timestamp is None:
+                        count = occurrences.get(symbol, 0)
+                        occurrences[symbol] = count + 1
+                        frame_time = count * interval
+                    else:
+                        frame_time = timestamp
+                    source.add_payload(symbol, frame_time, match.group(2))
+        return source
+
+    @classmethod
+    def from_tick_segments(cls, root, symbols=None, start_day=None, end_day=None, **kwargs):
+        """从TickRecorder记录目录创建，symbols为None时回放目录中的所有代码"""
+        source = cls(**kwargs)
+        if symbols is None:
+            symbols = set()
+            for day in os.listdir(root):
+                day_dir = os.path.join(root, day)
+                if os.path.isdir(day_dir):
+                    symbols.update(name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(day_dir)
+                                   if name.endswith(SEGMENT_SUFFIX))
+        for symbol in symbols:
+            for segment in open_segments(root, symbol, start_day, end_day):
+                with segment:
+                    times = segment.column('timestamp')
+                    prices = segment.column('price')
+                    prev_closes = segment.column('prev_close')
+                    volumes = segment.column('volume')
+                    source.add_day_ticks(symbol, list(times), list(prices), list(prev_closes),
+                                         list(volumes))
+        return source
+
+    def add_payload(self, symbol, timestamp, payload):
+        """添加一帧原始响应（hq_str_行引号内的内容），加载时即解析，回放时不再重复解析"""
+        self._add(symbol, timestamp, parse_payload(symbol, payload))
+
+    def add_day_ticks(self, symbol, times, prices, prev_closes, volumes=None):
+        """添加一个交易日的逐笔行情，并计算当日开盘、最高、最低
+
+        volumes为各笔的累计成交量，缺省时按0处理。
+        """
+        if not times:
+            return
+        if volumes is None:
+            volumes = [0.0] * len(times)
+        futures = symbol.startswith('hf_')
+        code = symbol[3:] if futures else symbol[2:]
+        open_price = high = low = prices[0]
+        for timestamp, price, prev_close, volume in zip(times, prices, prev_closes, volumes):
+            if price > high:
+                high = price
+            elif price < low:
+                low = price
+            change_amount = price - prev_close
+            data = {
+                'type': 'futures' if futures else 'stock',
+                'current_price': price,
+                'yesterday_close': prev_close,
+                'open_price': open_price,
+                'high_price': high,
+                'low_price': low,
+                'change_amount': change_amount,
+                'change_percent': change_amount / prev_close * 100 if prev_close else 0.0,
+                'update_time': format_quote_time(timestamp),
+                'volume': volume
+            }
+            if futures:
+                data.update({'futures_code': code, 'futures_name': code})
+            else:
+                data.update({'stock_code': code, 'stock_name': symbol})
+            self._add(symbol, timestamp, data)
+
+    def _add(self, symbol, timestamp, item):
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = ([], [])
+        times, items = series
+        if times and timestamp < times[-1]:
+            # 乱序数据插入到正确位置
+            i = bisect.bisect_right(times, timestamp)
+            times.insert(i, timestamp)
+            items.insert(i, item)
+        else:
+            times.append(timestamp)
+            items.append(item)
+        if self._start_time is None or timestamp < self._start_time:
+            self._start_time = timestamp
+        if self._end_time is None or timestamp > self._end_time:
+            self._end_time = timestamp
+
+    def symbols(self):
+        return list(self._series)
+
+    def start(self, at=None):
+        """从录制数据的起点（或at指定的时间戳）开始回放"""
+        self._wall_start = self._clock()
+        if at is not None:
+            self._start_time = at
+
+    def current_time(self):
+        """当前回放时刻（录制数据中的时间戳）"""
+        if self._start_time is None:
+            return None
+        if self._wall_start is None:
+            self.start()
+        elapsed = (self._clock() - self._wall_start) * self.speed
+        duration = self._end_time - self._start_time
+        if self.loop and duration > 0:
+            elapsed %= duration
+        return self._start_time + elapsed
+
+    @property
+    def finished(self):
+        """非循环模式下是否已回放到数据末尾"""
+        now = self.current_time()
+        return not self.loop and now is not None and now >= self._end_time
+
+    def _lookup(self, symbol, code):
+        series = self._series.get(symbol)
+        if series is None:
+            return {'error': "回放数据中没有该代码"}
+        times, items = series
+        i = bisect.bisect_right(times, self.current_time()) - 1
+        if i < 0:
+            return {'error': "回放尚未到达该代码的第一笔数据"}
+        item = items[i]
+        if isinstance(item, dict):
+            return item
+        return StockFuturesMonitor.quote_result(item)
+
+    def get_stock_data(self, stock_code):
+        exchange_prefix = StockFuturesMonitor.get_exchange_prefix(stock_code)
+        return self._lookup(f"{exchange_prefix}{stock_code}", stock_code)
+
+    def get_futures_data(self, futures_code):
+        return self._lookup(f"hf_{futures_code.upper()}", futures_code)
+
+    def get_batch_data(self, codes, max_url_length=None):
+        results, symbol_codes = StockFuturesMonitor.group_codes(codes)
+        for symbol, symbol_code_list in symbol_codes.items():
+            for code in symbol_code_list:
+                results[code] = self._lookup(symbol, code)
+        return results
@@ -0,0 +1,151 @@
+"""程序设置
+
+设置在启动时从用户配置目录读取一次，之后保存在内存中；修改后等待一段时间不再有新的修改才写入，
+写入时先写临时文件再替换，程序中途退出也不会留下不完整的配置文件。
+旧版本保存在程序目录下的config.json会在首次启动时迁移过来。
+"""
+import json
+import os
+import sys
+import threading
+
+APP_NAME = 'StockFuturesMonitor'
+
+
+def config_dir():
+    """用户配置目录：Windows为%APPDATA%，其他系统为$XDG_CONFIG_HOME或~/.config"""
+    if sys.platform.startswith('win'):
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, APP_NAME)
+
+
+class Settings:
+    """保存在内存中的程序设置，最后一次修改后save_delay秒内没有新的修改时写入磁盘
+
+    每项设置的类型由DEFAULTS中的默认值决定，读取到类型不符的值时使用默认值。
+    """
+    DEFAULTS = {
+        'background_color': '#ffffff',
+        'font_color': '#000000',
+        # 上次监控的代码（多个代码以逗号分隔）及是否为期货
+        'codes': '',
+        'futures': False,
+        # 上次使用的刷新时间（秒），空字符串表示使用默认值
+        'refresh_interval': '',
+        # 窗口位置和大小（QWidget.saveGeometry的Base64编码），空字符串表示由系统决定
+        'window_geometry': '',
+        # 旧版本保存的窗口左上角位置 [x, y]，没有window_geometry时使用
+        'window_position': None,
+    }
+    SAVE_DELAY = 1.0
+
+    def __init__(self, path=None, legacy_paths=(), save_delay=SAVE_DELAY):
+        self.path = path or os.path.join(config_dir(), 'config.json')
+        self.legacy_paths = list(legacy_paths)
+        self.save_delay = save_delay
+        self._values = dict(self.DEFAULTS)
+        self._lock = threading.Lock()
+        # 延迟写入的定时器线程与退出时的flush可能同时写文件
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.load()
+
+    @classmethod
+    def _coerce(cls, key, value):
+        """按默认值的类型检查读取到的值，不符时返回默认值"""
+        default = cls.DEFAULTS.get(key)
+        if default is None or value is None:
+            return value
+        if isinstance(default, bool):
+            return value if isinstance(value, bool) else default
+        if isinstance(default, float):
+            return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+        return value if isinstance(value, type(default)) else default
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return config if isinstance(config, dict) else None
+
+    def load(self):
+        """读取配置文件，不存在时从旧版本的config.json迁移"""
+        config = self._read(self.path)
+        migrated = False
+        if config is None:
+            for legacy_path in self.legacy_paths:
+                config = self._read(legacy_path)
+                if config is not None:
+                    migrated = True
+                    break
+        with self._lock:
+            for key, value in (config or {}).items():
+                if key in self.DEFAULTS:
+                    self._values[key] = self._coerce(key, value)
+        if migrated:
+            self._schedule()
+
+    def get(self, key):
+        with self._lock:
+            return self._values[key]
+
+    def set(self, key, value):
+        self.update(**{key: value})
+
+    def update(self, **values):
+        """修改一项或多项设置，值有变化时安排延迟写入"""
+        changed = False
+        with self._lock:
+            for key, value in values.items():
+                if key not in self.DEFAULTS:
+                    raise KeyError(f"未知的设置项: {key}")
+                value = self._coerce(key, value)
+                if self._values[key] != value:
+                    self._values[key] = value
+                    changed = True
+        if changed:
+            self._schedule()
+
+    def _schedule(self):
+        """每次修改都重新开始计时，连续修改（如拖动窗口）只写入一次"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """立即写入尚未保存的修改，写入失败时返回False"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                values = dict(self._values)
+                self._dirty = False
+            return self._write(values)
+
+    def _write(self, values):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(values, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存设置失败: {e}")
+            with self._lock:
+                self._dirty = True
+            return False
+        return True
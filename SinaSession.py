@@ -0,0 +1,191 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from Diagnostics import Diagnostics
+
+
+class HostHealth:
+    """单个主机的请求健康状况统计"""
+    __slots__ = ('successes', 'failures', 'consecutive_failures', 'last_error',
+                 'last_success_time', 'last_failure_time', 'avg_latency')
+
+    def __init__(self):
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_success_time = None
+        self.last_failure_time = None
+        # 请求耗时的指数移动平均（秒）
+        self.avg_latency = None
+
+    def record_success(self, latency):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.last_success_time = time.time()
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency = self.avg_latency * 0.8 + latency * 0.2
+
+    def record_failure(self, error):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        self.last_failure_time = time.time()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+_timed_adapter = None
+
+
+def _timed_adapter_class(base):
+    """返回记录新建连接耗时（DNS解析、TCP连接及HTTPS握手合计）的HTTPAdapter子类
+
+    复用keep-alive连接的请求不产生这一阶段。
+    """
+    global _timed_adapter
+    if _timed_adapter is not None:
+        return _timed_adapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed_connection(connection_cls):
+        class TimedConnection(connection_cls):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                Diagnostics.record('connect', time.perf_counter() - start)
+        return TimedConnection
+
+    pool_classes = {
+        'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,),
+                     {'ConnectionCls': timed_connection(HTTPConnection)}),
+        'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,),
+                      {'ConnectionCls': timed_connection(HTTPSConnection)}),
+    }
+
+    class TimedHTTPAdapter(base):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+    _timed_adapter = TimedHTTPAdapter
+    return _timed_adapter
+
+
+class SinaSession:
+    """带连接池和keep-alive的新浪行情HTTP会话，对瞬时错误做带抖动的指数退避重试"""
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+        "Referer": "http://finance.sina.com.cn"
+    }
+    # 视为瞬时错误、可以重试的HTTP状态码
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    # 连续失败达到该次数后认为主机不健康，不再重试以免请求风暴
+    UNHEALTHY_THRESHOLD = 5
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10,
+                 max_retries=3, backoff_base=0.2, backoff_max=5.0, headers=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # requests导入较慢，创建会话时才导入，不影响界面启动
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._network_errors = (requests.ConnectionError, requests.Timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers or self.DEFAULT_HEADERS)
+        # 重试由本类自行处理，适配器本身不重试
+        adapter = _timed_adapter_class(HTTPAdapter)(pool_connections=pool_size, pool_maxsize=pool_size,
+                                                    max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._health = {}
+        self._health_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """获取进程内共享的会话实例"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def configure(cls, **kwargs):
+        """用新的参数替换共享会话，如连接池大小和超时"""
+        with cls._shared_lock:
+            old = cls._shared
+            cls._shared = cls(**kwargs)
+        if old is not None:
+            old.close()
+        return cls._shared
+
+    def _get_health(self, host):
+        with self._health_lock:
+            health = self._health.get(host)
+            if health is None:
+                health = self._health[host] = HostHealth()
+            return health
+
+    def host_health(self, host=None):
+        """返回主机健康状况，不指定主机时返回所有主机"""
+        with self._health_lock:
+            if host is not None:
+                health = self._health.get(host)
+                return health.to_dict() if health else None
+            return {name: health.to_dict() for name, health in self._health.items()}
+
+    def is_healthy(self, host):
+        health = self._get_health(host)
+        return health.consecutive_failures < self.UNHEALTHY_THRESHOLD
+
+    def backoff_delay(self, attempt):
+        """第attempt次重试前的等待时间（全抖动指数退避）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, **kwargs):
+        """发送GET请求，对连接错误、超时和5xx/429响应进行重试"""
+        host = urlsplit(url).netloc
+        health = self._get_health(host)
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        # 主机连续失败时只尝试一次，等待其恢复
+        retries = self.max_retries if self.is_healthy(host) else 0
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except self._network_errors as e:
+                health.record_failure(e)
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUS:
+                    latency = time.perf_counter() - start
+                    Diagnostics.record('http', latency)
+                    health.record_success(latency)
+                    return response
+                health.record_failure(f"状态码: {response.status_code}")
+                if attempt >= retries:
+                    return response
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def close(self):
+        self.session.close()
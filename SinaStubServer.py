@@ -0,0 +1,313 @@
+"""本地新浪行情接口模拟服务器
+
+支持与 hq.sinajs.cn 相同的 /list=代码1,代码2 请求，返回GBK编码的 var hq_str_* 数据，
+并可注入延迟、错误、格式错误的行以及限流，用于离线测试和压测。
+/stream?list=代码1,代码2 为SSE推送源：先推送全部代码的快照，之后每隔push_interval秒推送
+随机一部分代码的新行情，空闲时发送心跳注释，供StreamingQuoteProvider测试使用。
+
+命令行用法：
+    python SinaStubServer.py --port 8000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import random
+import threading
+import sys
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+from QuoteParser import format_quote_time
+
+
+def make_stock_fields(index, rng, price=None, prev_close=None, volume=None):
+    """生成一只A股的33个行情字段，volume为当日累计成交量（股）"""
+    prev = prev_close if prev_close is not None else round(rng.uniform(2, 200), 2)
+    price = price if price is not None else round(prev * rng.uniform(0.9, 1.1), 2)
+    volume = volume if volume is not None else rng.randint(10 ** 5, 10 ** 8)
+    # 买一至买五价格依次降低，卖一至卖五依次升高
+    bids = ','.join(f"{rng.randint(100, 99999)},{price - (k + 1) * 0.01:.2f}" for k in range(5))
+    asks = ','.join(f"{rng.randint(100, 99999)},{price + k * 0.01:.2f}" for k in range(5))
+    turnover = volume * (prev + price) / 2
+    day, now = format_quote_time(time.time()).split()
+    return [f"股票{index}", f"{prev:.2f}", f"{prev:.2f}", f"{price:.2f}", f"{max(prev, price):.2f}",
+            f"{min(prev, price):.2f}", f"{price - 0.01:.2f}", f"{price:.2f}",
+            str(volume), f"{turnover:.3f}",
+            bids, asks, day, now, "00"]
+
+
+def make_futures_fields(index, rng, price=None, prev_close=None, volume=None):
+    """生成一个外盘期货的15个行情字段，volume为累计成交量"""
+    prev = prev_close if prev_close is not None else round(rng.uniform(1000, 20000), 2)
+    price = price if price is not None else round(prev * rng.uniform(0.97, 1.03), 2)
+    day, now = format_quote_time(time.time()).split()
+    return [f"{price:.2f}", "", f"{price - 0.25:.2f}", f"{price + 0.25:.2f}",
+            f"{max(prev, price):.2f}", f"{min(prev, price):.2f}", now,
+            f"{prev:.2f}", f"{prev:.2f}", str(rng.randint(1000, 9999)), "0", "0",
+            day, f"期货{index}", str(volume if volume is not None else 0)]
+
+
+def make_line(symbol, fields):
+    return f'var hq_str_{symbol}="{",".join(fields)}";'
+
+
+def make_payload(n_stocks, n_futures, seed=0):
+    """生成与新浪接口格式一致的GBK编码批量响应"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n_stocks):
+        symbol = f"sh{600000 + i}" if i % 2 == 0 else f"sz{i:06d}"
+        lines.append(make_line(symbol, make_stock_fields(i, rng)))
+    for i in range(n_futures):
+        lines.append(make_line(f"hf_F{i}", make_futures_fields(i, rng)))
+    return '\n'.join(lines).encode('gbk')
+
+
+def make_codes(n):
+    """生成n个用户代码供基准使用，约1%为外盘期货（与make_payload的期货代码一致）"""
+    futures = n // 100
+    codes = [f"{600000 + i}" for i in range(n - futures)]
+    codes += [f"hf_F{i}" for i in range(futures)]
+    return codes
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，关闭Nagle算法避免与延迟确认叠加产生40ms停顿
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path.startswith('/stream'):
+            stub.handle_stream(self)
+            return
+        status, body = stub.handle_request(self.path, self.headers)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/javascript; charset=GBK')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 压测客户端断开或重置连接是正常情况，不打印异常栈
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class SinaStubServer:
+    """本地新浪行情模拟服务器
+
+    latency/jitter：每个请求的固定延迟和随机附加延迟（秒）
+    error_rate：返回503的请求比例
+    malformed_rate：每一行被截断成格式错误数据的比例
+    rate_limit：每秒允许的请求数，超出时返回403（与新浪封禁时一致），None表示不限
+    push_interval/heartbeat_interval：推送源每次推送行情和发送心跳的间隔（秒）
+    static：每个代码只生成一次行情，之后原样返回，压测客户端时避免服务器生成数据成为瓶颈
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 malformed_rate=0.0, rate_limit=None, seed=None, push_interval=0.5, heartbeat_interval=5.0,
+                 static=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.rate_limit = rate_limit
+        self.push_interval = push_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.static = static
+        # static模式下已生成的行情行
+        self._lines = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # 新浪代码 -> [现价, 昨收, 累计成交量]，每次请求随机游走
+        self._prices = {}
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self.stats = {'requests': 0, 'symbols': 0, 'errors': 0, 'malformed': 0, 'rate_limited': 0,
+                      'streams': 0, 'events': 0}
+        self._stopping = threading.Event()
+
+        self._server = _StubHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread = None
+        self._saved_url = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    @property
+    def quote_url(self):
+        """可用于替换StockFuturesMonitor.QUOTE_URL的地址"""
+        host, port = self.address[:2]
+        return f"http://{host}:{port}/list="
+
+    @property
+    def stream_url(self):
+        """SSE推送源地址，用于StreamingQuoteProvider"""
+        host, port = self.address[:2]
+        return f"http://{host}:{port}/stream"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='SinaStubServer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def install(self):
+        """把StockFuturesMonitor的请求地址指向本服务器"""
+        from StockFuturesMonitor import StockFuturesMonitor
+        self._saved_url = StockFuturesMonitor.QUOTE_URL
+        StockFuturesMonitor.QUOTE_URL = self.quote_url
+
+    def uninstall(self):
+        if self._saved_url is not None:
+            from StockFuturesMonitor import StockFuturesMonitor
+            StockFuturesMonitor.QUOTE_URL = self._saved_url
+            self._saved_url = None
+
+    def __enter__(self):
+        self.start()
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+        self.stop()
+
+    def _check_rate_limit(self):
+        if self.rate_limit is None:
+            return True
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_requests = 0
+        self._window_requests += 1
+        return self._window_requests <= self.rate_limit
+
+    def render_symbol(self, symbol):
+        """生成一个代码的行情行，价格在上一次的基础上随机游走"""
+        line = self._lines.get(symbol) if self.static else None
+        if line is not None:
+            return line
+        rng = self._rng
+        state = self._prices.get(symbol)
+        futures = symbol.startswith('hf_')
+        if state is None:
+            prev = round(rng.uniform(1000, 20000) if futures else rng.uniform(2, 200), 2)
+            # [现价, 昨收, 累计成交量, 序号]，序号在首次出现时确定，名称不随其他代码的加入而变化
+            state = self._prices[symbol] = [prev, prev, 0, len(self._prices) + 1]
+        state[0] = round(max(0.01, state[0] * (1 + rng.gauss(0, 0.001))), 2)
+        state[2] += rng.randint(1, 100) * (1 if futures else 100)
+        index = state[3]
+        if futures:
+            fields = make_futures_fields(index, rng, state[0], state[1], state[2])
+        else:
+            fields = make_stock_fields(index, rng, state[0], state[1], state[2])
+        if self.malformed_rate and rng.random() < self.malformed_rate:
+            self.stats['malformed'] += 1
+            fields = fields[:rng.randint(0, 5)]
+        line = make_line(symbol, fields)
+        if self.static:
+            self._lines[symbol] = line
+        return line
+
+    def handle_request(self, path, headers):
+        """处理一个请求，返回 (状态码, 响应体)"""
+        with self._lock:
+            self.stats['requests'] += 1
+            limited = not self._check_rate_limit()
+            failed = not limited and self.error_rate and self._rng.random() < self.error_rate
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if limited:
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            return 403, b'Forbidden'
+        if failed:
+            with self._lock:
+                self.stats['errors'] += 1
+            return 503, b'Service Unavailable'
+
+        _, _, query = unquote(path).partition('list=')
+        symbols = [symbol for symbol in query.split('&', 1)[0].split(',') if symbol]
+        with self._lock:
+            self.stats['symbols'] += len(symbols)
+            lines = [self.render_symbol(symbol) for symbol in symbols]
+        return 200, '\n'.join(lines).encode('gbk')
+
+    def handle_stream(self, handler):
+        """SSE推送：先推送快照，之后每次推送随机一部分代码，直到客户端断开或服务器停止"""
+        _, _, query = unquote(handler.path).partition('list=')
+        symbols = [symbol for symbol in query.split('&', 1)[0].split(',') if symbol]
+        handler.close_connection = True
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        with self._lock:
+            self.stats['streams'] += 1
+        batch = symbols
+        last_sent = time.monotonic()
+        try:
+            while not self._stopping.is_set():
+                if batch:
+                    with self._lock:
+                        self.stats['events'] += 1
+                        self.stats['symbols'] += len(batch)
+                        lines = [self.render_symbol(symbol) for symbol in batch]
+                    handler.wfile.write(''.join(f"data: {line}\n" for line in lines).encode('utf-8') + b'\n')
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= self.heartbeat_interval:
+                    handler.wfile.write(b': heartbeat\n\n')
+                    last_sent = time.monotonic()
+                handler.wfile.flush()
+                if self._stopping.wait(self.push_interval):
+                    break
+                with self._lock:
+                    batch = [symbol for symbol in symbols if self._rng.random() < 0.5]
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地新浪行情接口模拟服务器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=None)
+    parser.add_argument('--push-interval', type=float, default=0.5)
+    parser.add_argument('--static', action='store_true', help="每个代码只生成一次行情")
+    args = parser.parse_args()
+
+    server = SinaStubServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                            args.malformed_rate, args.rate_limit, push_interval=args.push_interval,
+                            static=args.static)
+    print(f"模拟服务器已启动: {server.quote_url}")
+    print(f"推送源: {server.stream_url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""多进程全市场快照
+
+把代码列表按连续区间分给多个工作进程，每个进程获取并解析自己负责的代码，直接写入
+共享内存中的列存储（QuoteColumns），主进程读取同一块共享内存，不需要序列化行情字典。
+解析在各进程中并行，适合收盘或每个周期结束时一次获取数千个代码。
+
+命令行用法：
+    python SnapshotFarm.py --symbols-file codes.txt --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from StockFuturesMonitor import StockFuturesMonitor
+from QuoteParser import QuoteColumns
+from RefreshScheduler import RefreshScheduler
+
+# 工作进程中的状态，由_init_worker在进程启动时设置
+_worker = {}
+
+
+def _init_worker(shm_name, symbols, quote_url, max_url_length):
+    """工作进程初始化：连接共享内存并建立列存储视图"""
+    import threading
+    from SinaSession import SinaSession
+    # fork启动的进程继承了主进程的共享会话（连接池中的socket与主进程共用）和可能正被持有的锁，
+    # 丢弃后由SinaSession.shared()在本进程内重新创建
+    SinaSession._shared = None
+    SinaSession._shared_lock = threading.Lock()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    StockFuturesMonitor.QUOTE_URL = quote_url
+    _worker['shm'] = shm
+    _worker['symbols'] = symbols
+    _worker['columns'] = QuoteColumns(symbols, buffer=shm.buf)
+    _worker['max_url_length'] = max_url_length
+
+
+def _fetch_shard(start, stop):
+    """获取并解析symbols[start:stop]，结果写入共享内存，返回 (更新行数, 失败请求数, 获取耗时, 解析耗时)"""
+    from SinaSession import SinaSession
+    columns = _worker['columns']
+    valid = columns.valid
+    for row in range(start, stop):
+        valid[row] = 0
+    updated = errors = 0
+    fetch_time = parse_time = 0.0
+    for url in StockFuturesMonitor.build_batch_urls(_worker['symbols'][start:stop], _worker['max_url_length']):
+        begin = time.perf_counter()
+        try:
+            resp = SinaSession.shared().get(url)
+            if resp.status_code != 200:
+                errors += 1
+                continue
+            text = StockFuturesMonitor.decode_response(resp)
+        except Exception:
+            errors += 1
+            continue
+        finally:
+            fetch_time += time.perf_counter() - begin
+        begin = time.perf_counter()
+        updated += columns.fill(text)
+        parse_time += time.perf_counter() - begin
+    return updated, errors, fetch_time, parse_time
+
+
+class SnapshotFarm:
+    """多进程行情快照
+
+    codes为用户代码，按StockFuturesMonitor.get_sina_symbol转换并去重；workers默认为CPU核数。
+    snapshot()返回的QuoteColumns建立在共享内存上，下一次snapshot()会覆盖其中的数据，
+    需要保留时应先复制。使用完毕后调用close()结束工作进程并释放共享内存。
+    每个分片的请求数从scheduler的请求预算中扣除，预算不足时等待后再提交该分片；
+    scheduler默认为按默认预算新建的RefreshScheduler，传入request_budget为None的调度器时不限制。
+    """
+
+    def __init__(self, codes, workers=None, max_url_length=None, scheduler=None):
+        results, symbol_codes = StockFuturesMonitor.group_codes(codes)
+        # 无法查询的代码（如新三板）
+        self.code_errors = {code: data for code, data in results.items() if data is not None}
+        self.symbol_codes = symbol_codes
+        self.symbols = list(symbol_codes)
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.symbols) or 1))
+        size = len(self.symbols)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, QuoteColumns.buffer_size(size)))
+        self.columns = QuoteColumns(self.symbols, buffer=self._shm.buf)
+        # 按连续区间分片，各进程只写自己的行，不需要加锁
+        step = -(-size // self.workers) if size else 0
+        self.shards = [(start, min(size, start + step)) for start in range(0, size, step)] if size else []
+        # 每个分片需要的请求数，提交前从请求预算中扣除
+        self.shard_requests = [len(StockFuturesMonitor.build_batch_urls(self.symbols[start:stop], max_url_length))
+                               for start, stop in self.shards]
+        self.scheduler = scheduler if scheduler is not None else RefreshScheduler(market_hours=False)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(self._shm.name, self.symbols, StockFuturesMonitor.QUOTE_URL, max_url_length))
+        # 最近一次快照的统计：耗时、更新行数、失败请求数、各进程获取和解析耗时之和、等待请求预算的时间
+        self.last_stats = {}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def snapshot(self):
+        """获取全部代码的一次快照，返回共享内存上的QuoteColumns，valid为False的行获取失败"""
+        start = time.perf_counter()
+        throttled = 0.0
+        futures = []
+        for (begin, end), requests in zip(self.shards, self.shard_requests):
+            wait = self.scheduler.reserve(requests)
+            if wait > 0:
+                time.sleep(wait)
+                throttled += wait
+            futures.append(self._pool.submit(_fetch_shard, begin, end))
+        updated = errors = 0
+        fetch_time = parse_time = 0.0
+        for future in futures:
+            shard_updated, shard_errors, shard_fetch, shard_parse = future.result()
+            updated += shard_updated
+            errors += shard_errors
+            fetch_time += shard_fetch
+            parse_time += shard_parse
+        self.last_stats = {'elapsed': time.perf_counter() - start, 'updated': updated, 'errors': errors,
+                           'fetch': fetch_time, 'parse': parse_time, 'throttled': throttled}
+        return self.columns
+
+    def results(self):
+        """把最近一次快照转换为 {代码: 行情字典}，名称和时间不在共享内存中，为空字符串"""
+        results = dict(self.code_errors)
+        valid = self.columns.valid
+        for row, symbol in enumerate(self.symbols):
+            data = self.columns.quote(row).to_dict() if valid[row] else {'error': "获取数据失败，可能是代码错误"}
+            for code in self.symbol_codes[symbol]:
+                results[code] = data
+        return results
+
+    def close(self):
+        self._pool.shutdown()
+        if self.columns is not None:
+            self.columns.release()
+            self.columns = None
+            self._shm.close()
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程获取一次全市场行情快照")
+    parser.add_argument('codes', nargs='*', help="股票或期货代码")
+    parser.add_argument('--symbols-file', metavar='FILE', help="代码列表文件，每行一个或用逗号分隔")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数，默认为CPU核数")
+    parser.add_argument('--request-budget', type=float, default=RefreshScheduler.DEFAULT_REQUEST_BUDGET,
+                        help="每秒最多请求次数，0表示不限制")
+    args = parser.parse_args(argv)
+
+    from HeadlessMonitor import QuoteWriter, read_symbols_file
+    codes = list(args.codes)
+    if args.symbols_file:
+        codes.extend(read_symbols_file(args.symbols_file))
+    if not codes:
+        parser.error("请指定代码或 --symbols-file")
+
+    scheduler = RefreshScheduler(request_budget=args.request_budget or None, market_hours=False)
+    with SnapshotFarm(codes, args.workers, scheduler=scheduler) as farm:
+        farm.snapshot()
+        writer = QuoteWriter(sys.stdout)
+        fetched_at = time.time()
+        for code, data in farm.results().items():
+            writer.write(code, data, fetched_at)
+        writer.flush()
+        stats = farm.last_stats
+        print(f"{len(farm)} 个代码，{farm.workers} 个进程，耗时 {stats['elapsed'] * 1000:.1f} ms，"
+              f"失败请求 {stats['errors']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,72 +1,71 @@
 import time
 import re
-import requests
-from datetime import datetime
+from SinaSession import SinaSession
+from QuoteParser import HQ_LINE_PATTERN, parse_quotes
+from ExchangeResolver import ExchangeResolver
+from Diagnostics import Diagnostics
 
 class StockFuturesMonitor:
+    # 新浪行情接口，list=参数支持逗号分隔的多个代码
+    QUOTE_URL = "http://hq.sinajs.cn/list="
+    # 批量请求时单个URL的最大长度
+    MAX_URL_LENGTH = 2000
+    # 匹配响应中的每一行 var hq_str_xxx="...";
+    HQ_LINE_PATTERN = HQ_LINE_PATTERN
+    # 原始响应监听函数，接收 (时间戳, 响应文本)，用于录制行情以便回放
+    payload_listener = None
+
     def __init__(self):
         pass
 
+    @staticmethod
+    def notify_payload(text):
+        """将原始响应交给payload_listener（如已设置）"""
+        listener = StockFuturesMonitor.payload_listener
+        if listener is not None:
+            try:
+                listener(time.time(), text)
+            except Exception as e:
+                print(f"录制原始行情失败: {e}")
+
+    @staticmethod
+    def decode_response(response):
+        """按GBK解码响应正文并交给payload_listener"""
+        response.encoding = 'gbk'
+        start = time.perf_counter()
+        text = response.text
+        Diagnostics.record('decode', time.perf_counter() - start)
+        StockFuturesMonitor.notify_payload(text)
+        return text
+
+    @staticmethod
+    def get_exchange_prefix(stock_code):
+        """根据股票代码判断交易所前缀（sh/sz/nq），规则见 res/exchange_prefixes.json"""
+        return ExchangeResolver.default().resolve(stock_code).exchange
+
     @staticmethod
     def get_stock_data(stock_code):
-        # 自动判断交易所
-        if stock_code.startswith(('60', '68', '90', '51', '50', '52', '56', '58')):
-            exchange_prefix = 'sh'
-        elif stock_code.startswith(('00', '30', '20', '15', '16', '17', '18', '12', '13', '14', '19')):
-            exchange_prefix = 'sz'
-        elif stock_code.startswith(('4', '8')):  # 新三板
-            exchange_prefix = 'nq'  # 注意：新三板可能需要不同的API
-        elif stock_code.startswith('11'):  # 可转债（上海）
-            exchange_prefix = 'sh'
-        elif stock_code.startswith('12'):  # 可转债（深圳）
-            exchange_prefix = 'sz'
-        else:
-            # 默认深圳
-            exchange_prefix = 'sz'
+        exchange_prefix = StockFuturesMonitor.get_exchange_prefix(stock_code)
 
         # 新三板股票需要特殊处理
         if exchange_prefix == 'nq':
             return {'error': "暂不支持新三板股票查询"}
 
-        url = f"http://hq.sinajs.cn/list={exchange_prefix}{stock_code}"
+        symbol = f"{exchange_prefix}{stock_code}"
+        url = f"{StockFuturesMonitor.QUOTE_URL}{symbol}"
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "zh-CN,zh;q=0.9",
-            "Referer": "http://finance.sina.com.cn"
-        }
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.encoding = 'gbk'
+            response = SinaSession.shared().get(url)
             if response.status_code == 200:
-                data = response.text
+                data = StockFuturesMonitor.decode_response(response)
                 if 'var hq_str_sz' in data or 'var hq_str_sh' in data:
-                    stock_info = data.split('"')[1].split(',')
-                    if len(stock_info) >= 32:
-                        stock_name = stock_info[0]
-                        current_price = float(stock_info[3])
-                        yesterday_close = float(stock_info[2])
-                        open_price = float(stock_info[1])
-                        high_price = float(stock_info[4])
-                        low_price = float(stock_info[5])
-                        change_amount = current_price - yesterday_close
-                        change_percent = (change_amount / yesterday_close) * 100
-                        return {
-                            'type': 'stock',
-                            'stock_code': stock_code,
-                            'stock_name': stock_name,
-                            'current_price': current_price,
-                            'yesterday_close': yesterday_close,
-                            'open_price': open_price,
-                            'high_price': high_price,
-                            'low_price': low_price,
-                            'change_amount': change_amount,
-                            'change_percent': change_percent,
-                            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                    else:
+                    start = time.perf_counter()
+                    quote = parse_quotes(data).get(symbol)
+                    Diagnostics.record('parse', time.perf_counter() - start)
+                    if quote is None:
                         return {'error': "数据格式错误或股票代码不存在"}
+                    Diagnostics.count('quotes')
+                    return quote.to_dict()
                 else:
                     return {'error': "获取数据失败，可能是股票代码错误"}
             else:
@@ -76,52 +75,150 @@ class StockFuturesMonitor:
 
     @staticmethod
     def get_futures_data(futures_code):
-        def safe_float(val):
-            try:
-                return float(val)
-            except (ValueError, TypeError):
-                return 0.0
-
-        url = f"http://hq.sinajs.cn/list=hf_{futures_code.upper()}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "zh-CN,zh;q=0.9",
-            "Referer": "http://finance.sina.com.cn"
-        }
+        symbol = f"hf_{futures_code.upper()}"
+        url = f"{StockFuturesMonitor.QUOTE_URL}{symbol}"
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.encoding = 'gbk'
+            resp = SinaSession.shared().get(url)
             if resp.status_code == 200:
-                data = resp.text
-                info = data.split('"')[1].split(',')
-                if len(info) > 13:
-                    current_price = safe_float(info[0])
-                    open_price = safe_float(info[8])
-                    high_price = safe_float(info[4])
-                    low_price = safe_float(info[5])
-                    yesterday_close = safe_float(info[7])
-                    change_amount = current_price - yesterday_close
-                    update_time = info[6]
-                    change_percent = (change_amount / yesterday_close) * 100
-                    futures_name = info[13] if len(info) > 13 else futures_code.upper()
-
-                    return {
-                        'type': 'futures',
-                        'futures_code': futures_code.upper(),
-                        'futures_name': futures_name,
-                        'current_price': current_price,
-                        'yesterday_close': yesterday_close,
-                        'open_price': open_price,
-                        'high_price': high_price,
-                        'low_price': low_price,
-                        'change_amount': change_amount,
-                        'change_percent': change_percent,
-                        'update_time': update_time
-                    }
-                else:
+                data = StockFuturesMonitor.decode_response(resp)
+                start = time.perf_counter()
+                quote = parse_quotes(data).get(symbol)
+                Diagnostics.record('parse', time.perf_counter() - start)
+                if quote is None:
                     return {'error': "期货数据格式异常"}
+                Diagnostics.count('quotes')
+                return quote.to_dict()
             else:
                 return {'error': f"请求失败，状态码: {resp.status_code}"}
         except Exception as e:
             return {'error': f"获取期货数据时出错: {e}"}
+
+    @staticmethod
+    def is_futures_code(code):
+        """判断代码是否为外盘期货代码（如 NQ、hf_GC），纯数字或带sh/sz前缀的视为股票"""
+        code = code.strip()
+        if code.lower().startswith('hf_'):
+            return True
+        if code[:2].lower() in ('sh', 'sz') and code[2:].isdigit():
+            return False
+        return not code.isdigit()
+
+    @staticmethod
+    def get_sina_symbol(code):
+        """将用户输入的代码转换为新浪list=参数中的代码，新三板返回None"""
+        code = code.strip()
+        if StockFuturesMonitor.is_futures_code(code):
+            if code.lower().startswith('hf_'):
+                code = code[3:]
+            return f"hf_{code.upper()}"
+        if code[:2].lower() in ('sh', 'sz'):
+            return code.lower()
+        exchange_prefix = StockFuturesMonitor.get_exchange_prefix(code)
+        if exchange_prefix == 'nq':
+            return None
+        return f"{exchange_prefix}{code}"
+
+    @staticmethod
+    def get_data_symbol(data):
+        """返回行情字典对应的新浪代码，如 sz159659、hf_NQ；价差等合成行情返回其名称"""
+        if data.get('type') == 'spread':
+            return data['spread_name']
+        if data.get('type') == 'futures':
+            return f"hf_{data['futures_code']}"
+        stock_code = data['stock_code']
+        return f"{StockFuturesMonitor.get_exchange_prefix(stock_code)}{stock_code}"
+
+    @staticmethod
+    def build_batch_urls(symbols, max_url_length=None):
+        """将新浪代码列表按URL长度上限切分为尽量少的list=请求URL"""
+        if max_url_length is None:
+            max_url_length = StockFuturesMonitor.MAX_URL_LENGTH
+        urls = []
+        current = []
+        length = len(StockFuturesMonitor.QUOTE_URL)
+        for symbol in symbols:
+            # 除第一个代码外，每个代码还需要一个逗号分隔符
+            extra = len(symbol) + (1 if current else 0)
+            if current and length + extra > max_url_length:
+                urls.append(StockFuturesMonitor.QUOTE_URL + ','.join(current))
+                current = []
+                length = len(StockFuturesMonitor.QUOTE_URL)
+                extra = len(symbol)
+            current.append(symbol)
+            length += extra
+        if current:
+            urls.append(StockFuturesMonitor.QUOTE_URL + ','.join(current))
+        return urls
+
+    @staticmethod
+    def group_codes(codes):
+        """将用户代码转换为新浪代码并去重
+
+        返回 (results, symbol_codes)：results 以用户代码为键，无法查询的代码已填入错误，
+        其余为None；symbol_codes 为 新浪代码 -> 用户代码列表（同一代码可能以不同写法重复传入）。
+        """
+        results = {}
+        symbols = {}
+        plain = []
+        for code in codes:
+            code = code.strip()
+            if not code or code in results:
+                continue
+            results[code] = None
+            if StockFuturesMonitor.is_futures_code(code) or code[:2].lower() in ('sh', 'sz'):
+                symbols[code] = StockFuturesMonitor.get_sina_symbol(code)
+            else:
+                plain.append(code)
+        # 不带前缀的股票代码按交易所分组一次解析
+        for exchange, group in ExchangeResolver.default().resolve_many(plain).items():
+            for code in group:
+                symbols[code] = None if exchange == 'nq' else f"{exchange}{code}"
+
+        symbol_codes = {}
+        for code in results:
+            symbol = symbols[code]
+            if symbol is None:
+                results[code] = {'error': "暂不支持新三板股票查询"}
+                continue
+            symbol_codes.setdefault(symbol, []).append(code)
+        return results, symbol_codes
+
+    @staticmethod
+    def quote_result(quote):
+        """将parse_quotes的结果转换为行情字典，quote为None表示响应中没有该代码或数据格式错误"""
+        if quote is None:
+            return {'error': "获取数据失败，可能是代码错误"}
+        return quote.to_dict()
+
+    @staticmethod
+    def get_batch_data(codes, max_url_length=None):
+        """批量获取股票和期货行情，股票与期货代码可以混合传入，返回以代码为键的行情字典"""
+        results, symbol_codes = StockFuturesMonitor.group_codes(codes)
+
+        for url in StockFuturesMonitor.build_batch_urls(list(symbol_codes), max_url_length):
+            symbols = url[len(StockFuturesMonitor.QUOTE_URL):].split(',')
+            try:
+                resp = SinaSession.shared().get(url)
+                if resp.status_code != 200:
+                    error = {'error': f"请求失败，状态码: {resp.status_code}"}
+                    for symbol in symbols:
+                        for code in symbol_codes[symbol]:
+                            results[code] = error
+                    continue
+                text = StockFuturesMonitor.decode_response(resp)
+                start = time.perf_counter()
+                quotes = parse_quotes(text)
+            except Exception as e:
+                error = {'error': f"批量获取数据时出错: {e}"}
+                for symbol in symbols:
+                    for code in symbol_codes[symbol]:
+                        results[code] = error
+                continue
+
+            for symbol in symbols:
+                quote = quotes.get(symbol)
+                for code in symbol_codes[symbol]:
+                    results[code] = StockFuturesMonitor.quote_result(quote)
+            Diagnostics.record('parse', time.perf_counter() - start)
+            Diagnostics.count('quotes', len(symbols))
+        return results
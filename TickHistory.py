@@ -0,0 +1,206 @@
+from array import array
+
+
+def _zeros(size):
+    """预分配size个double的数组"""
+    return array('d', bytes(8 * size))
+
+
+class TickRingBuffer:
+    """固定容量的逐笔行情环形缓冲区，写满后覆盖最旧的数据"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.times = _zeros(capacity)
+        self.prices = _zeros(capacity)
+        self.volumes = _zeros(capacity)
+        # 下一次写入的位置和已写入的总数
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, timestamp, price, volume=0.0):
+        i = self._head
+        self.times[i] = timestamp
+        self.prices[i] = price
+        self.volumes[i] = volume
+        self._head = (i + 1) % self.capacity
+        self._count += 1
+
+    def latest(self):
+        """返回最新一笔 (时间戳, 价格, 成交量)，缓冲区为空时返回None"""
+        if not self._count:
+            return None
+        i = (self._head - 1) % self.capacity
+        return self.times[i], self.prices[i], self.volumes[i]
+
+    def _ordered(self, column, n):
+        size = len(self)
+        n = size if n is None else min(n, size)
+        start = (self._head - n) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            return column[start:end]
+        return column[start:] + column[:end - self.capacity]
+
+    def last_prices(self, n=None):
+        """按时间顺序返回最近n笔价格（默认全部）"""
+        return self._ordered(self.prices, n)
+
+    def last_times(self, n=None):
+        """按时间顺序返回最近n笔时间戳（默认全部）"""
+        return self._ordered(self.times, n)
+
+    def nbytes(self):
+        return 3 * 8 * self.capacity
+
+
+class BarRingBuffer:
+    """固定容量的K线环形缓冲区"""
+    COLUMNS = ('starts', 'opens', 'highs', 'lows', 'closes', 'ticks')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        for name in self.COLUMNS:
+            setattr(self, name, _zeros(capacity))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, start, open_price, high, low, close, ticks):
+        i = self._head
+        self.starts[i] = start
+        self.opens[i] = open_price
+        self.highs[i] = high
+        self.lows[i] = low
+        self.closes[i] = close
+        self.ticks[i] = ticks
+        self._head = (i + 1) % self.capacity
+        self._count += 1
+
+    def bar(self, age=0):
+        """返回倒数第age+1根已完成的K线 (起始时间, 开, 高, 低, 收, 笔数)"""
+        if age >= len(self):
+            return None
+        i = (self._head - 1 - age) % self.capacity
+        return (self.starts[i], self.opens[i], self.highs[i], self.lows[i], self.closes[i],
+                int(self.ticks[i]))
+
+    def bars(self, n=None):
+        """按时间顺序返回最近n根已完成的K线"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        return [self.bar(age) for age in range(n - 1, -1, -1)]
+
+    def nbytes(self):
+        return len(self.COLUMNS) * 8 * self.capacity
+
+
+class BarAggregator:
+    """按固定周期增量聚合OHLC K线，每笔行情O(1)更新"""
+
+    def __init__(self, interval, capacity):
+        self.interval = interval
+        self.completed = BarRingBuffer(capacity)
+        # 当前未完成K线
+        self.start = None
+        self.open = self.high = self.low = self.close = 0.0
+        self.ticks = 0
+
+    def update(self, timestamp, price):
+        """加入一笔行情，若因此完成了一根K线则返回True"""
+        start = timestamp - timestamp % self.interval
+        if start == self.start:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+            self.close = price
+            self.ticks += 1
+            return False
+
+        closed = self.start is not None
+        if closed:
+            self.completed.append(self.start, self.open, self.high, self.low, self.close, self.ticks)
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.ticks = 1
+        return closed
+
+    def current(self):
+        """返回当前未完成的K线，尚无数据时返回None"""
+        if self.start is None:
+            return None
+        return self.start, self.open, self.high, self.low, self.close, self.ticks
+
+
+class SymbolHistory:
+    """单个代码的逐笔行情缓冲区及多周期K线"""
+
+    def __init__(self, tick_capacity, bar_specs):
+        self.ticks = TickRingBuffer(tick_capacity)
+        # 周期（秒）-> BarAggregator
+        self.bars = {interval: BarAggregator(interval, capacity) for interval, capacity in bar_specs}
+
+    def update(self, timestamp, price, volume=0.0):
+        self.ticks.append(timestamp, price, volume)
+        for aggregator in self.bars.values():
+            aggregator.update(timestamp, price)
+
+    def nbytes(self):
+        return self.ticks.nbytes() + sum(a.completed.nbytes() for a in self.bars.values())
+
+
+class TickHistory:
+    """按代码保存逐笔行情并聚合1秒、1分钟、5分钟K线
+
+    每个代码的缓冲区容量固定，内存占用只与代码数量有关，与运行时长无关。
+    """
+    # (周期秒数, 保留的已完成K线数量)
+    DEFAULT_BAR_SPECS = ((1, 900), (60, 600), (300, 288))
+
+    def __init__(self, tick_capacity=4096, bar_specs=DEFAULT_BAR_SPECS):
+        self.tick_capacity = tick_capacity
+        self.bar_specs = tuple(bar_specs)
+        self._symbols = {}
+
+    def __contains__(self, symbol):
+        return symbol in self._symbols
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def get(self, symbol):
+        """获取代码的历史数据，不存在时返回None"""
+        return self._symbols.get(symbol)
+
+    def record(self, symbol, timestamp, price, volume=0.0):
+        """记录一笔行情"""
+        history = self._symbols.get(symbol)
+        if history is None:
+            history = self._symbols[symbol] = SymbolHistory(self.tick_capacity, self.bar_specs)
+        history.update(timestamp, price, volume)
+        return history
+
+    def recent_prices(self, symbol, n):
+        """按时间顺序返回代码最近n笔价格"""
+        history = self._symbols.get(symbol)
+        if history is None:
+            return array('d')
+        return history.ticks.last_prices(n)
+
+    def discard(self, symbol):
+        self._symbols.pop(symbol, None)
+
+    def retain(self, symbols):
+        """只保留symbols中代码的历史数据，释放其余代码的缓冲区"""
+        for symbol in [symbol for symbol in self._symbols if symbol not in symbols]:
+            self.discard(symbol)
+
+    def nbytes(self):
+        """所有缓冲区占用的字节数"""
+        return sum(history.nbytes() for history in self._symbols.values())
@@ -0,0 +1,215 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，缺失时以memoryview提供只读视图
+    np = None
+
+# 文件头：魔数(8字节) + 版本(uint16) + 记录长度(uint16) + 保留(4字节)
+HEADER = struct.Struct('<8sHH4x')
+MAGIC = b'SFMTICK\x00'
+VERSION = 1
+# 定长记录：时间戳, 现价, 昨收, 成交量
+RECORD = struct.Struct('<dddd')
+FIELDS = ('timestamp', 'price', 'prev_close', 'volume')
+SEGMENT_SUFFIX = '.tick'
+
+if np is not None:
+    TICK_DTYPE = np.dtype([(name, '<f8') for name in FIELDS])
+else:
+    TICK_DTYPE = None
+
+
+def segment_path(root, symbol, timestamp):
+    """某代码某一天的数据段路径：root/YYYYMMDD/symbol.tick"""
+    day = time.strftime('%Y%m%d', time.localtime(timestamp))
+    return os.path.join(root, day, f"{symbol}{SEGMENT_SUFFIX}")
+
+
+class TickRecorder:
+    """追加写入的逐笔行情记录器
+
+    每个代码每天一个数据段文件，记录为定长二进制。写入先放入队列，由后台线程
+    攒批后写盘并fsync，调用方（如GUI线程）不会被磁盘IO阻塞。
+    """
+
+    def __init__(self, root, flush_interval=1.0, batch_size=4096):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        # 数据段路径 -> 打开的文件
+        self._files = {}
+        self.records_written = 0
+        self._thread = threading.Thread(target=self._run, name='TickRecorder', daemon=True)
+        self._thread.start()
+
+    def record(self, symbol, timestamp, price, prev_close, volume=0.0):
+        """记录一笔行情（线程安全，不阻塞）"""
+        self._queue.put((symbol, timestamp, price, prev_close, volume))
+
+    def record_quote(self, symbol, data, timestamp=None):
+        """记录StockFuturesMonitor返回的行情字典"""
+        if 'error' in data:
+            return
+        self.record(symbol, timestamp if timestamp is not None else time.time(),
+                    data['current_price'], data['yesterday_close'], data.get('volume', 0.0))
+
+    @staticmethod
+    def _repair_segment(path):
+        """截掉上次异常退出时写了一半的记录，使追加的记录保持对齐"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size < HEADER.size:
+            # 文件头都不完整时重新写文件头
+            valid = 0
+        else:
+            valid = size - (size - HEADER.size) % RECORD.size
+        if valid != size:
+            os.truncate(path, valid)
+
+    def _open_segment(self, path):
+        f = self._files.get(path)
+        if f is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._repair_segment(path)
+            f = open(path, 'ab')
+            if f.tell() == 0:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._files[path] = f
+        return f
+
+    def _write_batch(self, batch):
+        # 按数据段分组后一次性写入
+        pending = {}
+        for symbol, timestamp, price, prev_close, volume in batch:
+            path = segment_path(self.root, symbol, timestamp)
+            buf = pending.get(path)
+            if buf is None:
+                buf = pending[path] = bytearray()
+            buf += RECORD.pack(timestamp, price, prev_close, volume)
+        for path, buf in pending.items():
+            f = self._open_segment(path)
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+        self.records_written += len(batch)
+        # 进入新的一天后关闭之前日期的数据段，迟到的旧行情会重新以追加方式打开
+        latest = max(os.path.basename(os.path.dirname(path)) for path in pending)
+        for path in list(self._files):
+            if os.path.basename(os.path.dirname(path)) < latest:
+                self._files.pop(path).close()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self._write_batch(batch)
+                except OSError as e:
+                    print(f"写入行情记录失败: {e}")
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def close(self):
+        """写入剩余数据并停止后台线程"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class TickSegment:
+    """以内存映射方式只读打开一个数据段，零拷贝地暴露全部记录"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"数据段为空: {path}")
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"数据段不完整: {path}")
+        magic, version, record_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"无法识别的数据段格式: {path}")
+        # 写入方可能正在追加，只取完整的记录
+        self.count = (len(self._mmap) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def array(self):
+        """返回结构化NumPy数组视图（字段见FIELDS），数据直接映射自文件"""
+        if np is None:
+            raise RuntimeError("需要安装NumPy")
+        return np.frombuffer(self._mmap, dtype=TICK_DTYPE, count=self.count, offset=HEADER.size)
+
+    def column(self, name):
+        """返回某个字段的只读视图：有NumPy时为ndarray，否则为memoryview"""
+        if np is not None:
+            return self.array()[name]
+        index = FIELDS.index(name)
+        end = HEADER.size + self.count * RECORD.size
+        doubles = memoryview(self._mmap)[HEADER.size:end].cast('d')
+        return doubles[index::len(FIELDS)]
+
+    def close(self):
+        # 仍有NumPy视图引用映射时无法立即关闭，交由垃圾回收处理
+        try:
+            self._mmap.close()
+        except (BufferError, AttributeError):
+            pass
+        self._file.close()
+
+
+def list_segments(root, symbol, start_day=None, end_day=None):
+    """列出某代码在[start_day, end_day]（YYYYMMDD字符串）之间的数据段路径，按日期排序"""
+    paths = []
+    if not os.path.isdir(root):
+        return paths
+    for day in sorted(os.listdir(root)):
+        if start_day is not None and day < start_day:
+            continue
+        if end_day is not None and day > end_day:
+            continue
+        path = os.path.join(root, day, f"{symbol}{SEGMENT_SUFFIX}")
+        if os.path.exists(path):
+            paths.append(path)
+    return paths
+
+
+def open_segments(root, symbol, start_day=None, end_day=None):
+    """打开某代码在日期范围内的所有数据段"""
+    return [TickSegment(path) for path in list_segments(root, symbol, start_day, end_day)]
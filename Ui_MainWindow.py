@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'MainWindow.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Form(object):
+    def setupUi(self, Form):
+        Form.setObjectName("Form")
+        Form.resize(258, 328)
+        icon = QtGui.QIcon()
+        icon.addPixmap(QtGui.QPixmap("res/icon.jpg"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        Form.setWindowIcon(icon)
+        Form.setStyleSheet("QWidget { background-color: rgb(255, 255, 255);}")
+        self.gridLayout_4 = QtWidgets.QGridLayout(Form)
+        self.gridLayout_4.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_4.setObjectName("gridLayout_4")
+        self.gridLayout_3 = QtWidgets.QGridLayout()
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.widget = QtWidgets.QWidget(Form)
+        self.widget.setObjectName("widget")
+        self.gridLayout = QtWidgets.QGridLayout(self.widget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.verticalLayout = QtWidgets.QVBoxLayout()
+        self.verticalLayout.setObjectName("verticalLayout")
+        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout.addItem(spacerItem)
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem1)
+        self.radioButton = QtWidgets.QRadioButton(self.widget)
+        self.radioButton.setStyleSheet("\n"
+"\n"
+"QRadioButton::indicator {\n"
+"    width: 16px;\n"
+"    height: 16px;\n"
+"    border: 1px solid rgb(150, 150, 150);\n"
+"    background: rgb(255, 255, 255);\n"
+"    border-radius: 8px; /* 设置为圆形 */\n"
+"}\n"
+"\n"
+"QRadioButton::indicator:hover {\n"
+"    background: rgb(242, 242, 242);\n"
+"}\n"
+"\n"
+"QRadioButton::indicator:checked {\n"
+"    image: url(./res/radioButton.png);\n"
+"    border-radius: 8px; /* 确保选中状态也为圆形 */\n"
+"}")
+        self.radioButton.setChecked(True)
+        self.radioButton.setObjectName("radioButton")
+        self.horizontalLayout.addWidget(self.radioButton)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem2)
+        self.radioButton_2 = QtWidgets.QRadioButton(self.widget)
+        self.radioButton_2.setStyleSheet("\n"
+"\n"
+"QRadioButton::indicator {\n"
+"    width: 16px;\n"
+"    height: 16px;\n"
+"    border: 1px solid rgb(150, 150, 150);\n"
+"    background: rgb(255, 255, 255);\n"
+"    border-radius: 8px; /* 设置为圆形 */\n"
+"}\n"
+"\n"
+"QRadioButton::indicator:hover {\n"
+"    background: rgb(242, 242, 242);\n"
+"}\n"
+"\n"
+"QRadioButton::indicator:checked {\n"
+"    image: url(./res/radioButton.png);\n"
+"    border-radius: 8px; /* 确保选中状态也为圆形 */\n"
+"}")
+        self.radioButton_2.setObjectName("radioButton_2")
+        self.horizontalLayout.addWidget(self.radioButton_2)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem3)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        spacerItem4 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
+        self.verticalLayout.addItem(spacerItem4)
+        self.horizontalLayout_4 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_4.setObjectName("horizontalLayout_4")
+        spacerItem5 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_4.addItem(spacerItem5)
+        self.label = QtWidgets.QLabel(self.widget)
+        self.label.setMinimumSize(QtCore.QSize(80, 0))
+        self.label.setMaximumSize(QtCore.QSize(1, 16777215))
+        self.label.setObjectName("label")
+        self.horizontalLayout_4.addWidget(self.label)
+        spacerItem6 = QtWidgets.QSpacerItem(10, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_4.addItem(spacerItem6)
+        self.lineEdit = QtWidgets.QLineEdit(self.widget)
+        self.lineEdit.setMinimumSize(QtCore.QSize(100, 25))
+        self.lineEdit.setMaximumSize(QtCore.QSize(100, 25))
+        self.lineEdit.setStyleSheet("QLineEdit {\n"
+"    border: 1px solid rgb(192, 192, 192); /* 默认边框颜色 */\n"
+"}\n"
+"QLineEdit:focus {\n"
+"    border: 1px solid rgb(50, 170, 233); /* 焦点时的边框颜色 */\n"
+"    outline: none;                       /* 移除默认虚线框 */\n"
+"}")
+        self.lineEdit.setObjectName("lineEdit")
+        self.horizontalLayout_4.addWidget(self.lineEdit)
+        spacerItem7 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_4.addItem(spacerItem7)
+        self.verticalLayout.addLayout(self.horizontalLayout_4)
+        spacerItem8 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
+        self.verticalLayout.addItem(spacerItem8)
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        spacerItem9 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_3.addItem(spacerItem9)
+        self.label_2 = QtWidgets.QLabel(self.widget)
+        self.label_2.setMinimumSize(QtCore.QSize(80, 0))
+        self.label_2.setObjectName("label_2")
+        self.horizontalLayout_3.addWidget(self.label_2)
+        spacerItem10 = QtWidgets.QSpacerItem(10, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_3.addItem(spacerItem10)
+        self.lineEdit_2 = QtWidgets.QLineEdit(self.widget)
+        self.lineEdit_2.setMinimumSize(QtCore.QSize(100, 25))
+        self.lineEdit_2.setMaximumSize(QtCore.QSize(100, 25))
+        self.lineEdit_2.setStyleSheet("QLineEdit {\n"
+"    border: 1px solid rgb(192, 192, 192); /* 默认边框颜色 */\n"
+"}\n"
+"QLineEdit:focus {\n"
+"    border: 1px solid rgb(50, 170, 233); /* 焦点时的边框颜色 */\n"
+"    outline: none;                       /* 移除默认虚线框 */\n"
+"}")
+        self.lineEdit_2.setObjectName("lineEdit_2")
+        self.horizontalLayout_3.addWidget(self.lineEdit_2)
+        spacerItem11 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_3.addItem(spacerItem11)
+        self.verticalLayout.addLayout(self.horizontalLayout_3)
+        spacerItem12 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
+        self.verticalLayout.addItem(spacerItem12)
+        self.horizontalLayout_5 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_5.setObjectName("horizontalLayout_5")
+        spacerItem13 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_5.addItem(spacerItem13)
+        self.pushButton_4 = QtWidgets.QPushButton(self.widget)
+        self.pushButton_4.setMinimumSize(QtCore.QSize(100, 25))
+        self.pushButton_4.setMaximumSize(QtCore.QSize(100, 25))
+        self.pushButton_4.setStyleSheet("QPushButton {\n"
+"    background-color: rgb(255, 255, 255); /* 背景色 */\n"
+"    border: 1px solid rgb(122, 122, 122); /* 边框色 */\n"
+"    border-radius: 2px; /* 圆润边框 */\n"
+"}\n"
+"\n"
+"QPushButton:hover {\n"
+"    background-color: rgb(242, 242, 242); /* 鼠标悬浮背景色 */\n"
+"}\n"
+"\n"
+"QPushButton:pressed {\n"
+"    background-color: rgb(235, 235, 235); /* 鼠标点击背景色 */\n"
+"}\n"
+"")
+        self.pushButton_4.setObjectName("pushButton_4")
+        self.horizontalLayout_5.addWidget(self.pushButton_4)
+        spacerItem14 = QtWidgets.QSpacerItem(10, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_5.addItem(spacerItem14)
+        self.pushButton_3 = QtWidgets.QPushButton(self.widget)
+        self.pushButton_3.setMinimumSize(QtCore.QSize(100, 25))
+        self.pushButton_3.setMaximumSize(QtCore.QSize(100, 25))
+        self.pushButton_3.setStyleSheet("QPushButton {\n"
+"    background-color: rgb(255, 255, 255); /* 背景色 */\n"
+"    border: 1px solid rgb(122, 122, 122); /* 边框色 */\n"
+"    border-radius: 2px; /* 圆润边框 */\n"
+"}\n"
+"\n"
+"QPushButton:hover {\n"
+"    background-color: rgb(242, 242, 242); /* 鼠标悬浮背景色 */\n"
+"}\n"
+"\n"
+"QPushButton:pressed {\n"
+"    background-color: rgb(235, 235, 235); /* 鼠标点击背景色 */\n"
+"}\n"
+"")
+        self.pushButton_3.setObjectName("pushButton_3")
+        self.horizontalLayout_5.addWidget(self.pushButton_3)
+        spacerItem15 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_5.addItem(spacerItem15)
+        self.verticalLayout.addLayout(self.horizontalLayout_5)
+        spacerItem16 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
+        self.verticalLayout.addItem(spacerItem16)
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        spacerItem17 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem17)
+        self.pushButton = QtWidgets.QPushButton(self.widget)
+        self.pushButton.setMinimumSize(QtCore.QSize(100, 25))
+        self.pushButton.setMaximumSize(QtCore.QSize(100, 25))
+        self.pushButton.setStyleSheet("QPushButton {\n"
+"    background-color: rgb(255, 255, 255); /* 背景色 */\n"
+"    border: 1px solid rgb(122, 122, 122); /* 边框色 */\n"
+"    border-radius: 2px; /* 圆润边框 */\n"
+"}\n"
+"\n"
+"QPushButton:hover {\n"
+"    background-color: rgb(242, 242, 242); /* 鼠标悬浮背景色 */\n"
+"}\n"
+"\n"
+"QPushButton:pressed {\n"
+"    background-color: rgb(235, 235, 235); /* 鼠标点击背景色 */\n"
+"}\n"
+"")
+        self.pushButton.setObjectName("pushButton")
+        self.horizontalLayout_2.addWidget(self.pushButton)
+        spacerItem18 = QtWidgets.QSpacerItem(10, 20, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem18)
+        self.pushButton_2 = QtWidgets.QPushButton(self.widget)
+        self.pushButton_2.setMinimumSize(QtCore.QSize(100, 25))
+        self.pushButton_2.setMaximumSize(QtCore.QSize(100, 25))
+        self.pushButton_2.setStyleSheet("QPushButton {\n"
+"    background-color: rgb(255, 255, 255); /* 背景色 */\n"
+"    border: 1px solid rgb(122, 122, 122); /* 边框色 */\n"
+"    border-radius: 2px; /* 圆润边框 */\n"
+"}\n"
+"\n"
+"QPushButton:hover {\n"
+"    background-color: rgb(242, 242, 242); /* 鼠标悬浮背景色 */\n"
+"}\n"
+"\n"
+"QPushButton:pressed {\n"
+"    background-color: rgb(235, 235, 235); /* 鼠标点击背景色 */\n"
+"}\n"
+"")
+        self.pushButton_2.setObjectName("pushButton_2")
+        self.horizontalLayout_2.addWidget(self.pushButton_2)
+        spacerItem19 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem19)
+        self.verticalLayout.addLayout(self.horizontalLayout_2)
+        spacerItem20 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout.addItem(spacerItem20)
+        self.gridLayout.addLayout(self.verticalLayout, 0, 0, 1, 1)
+        self.gridLayout_3.addWidget(self.widget, 0, 0, 1, 1)
+        self.widget_2 = QtWidgets.QWidget(Form)
+        self.widget_2.setObjectName("widget_2")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.widget_2)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.label_3 = QtWidgets.QLabel(self.widget_2)
+        self.label_3.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout_2.addWidget(self.label_3, 0, 0, 1, 1)
+        self.gridLayout_3.addWidget(self.widget_2, 1, 0, 1, 1)
+        self.gridLayout_4.addLayout(self.gridLayout_3, 0, 0, 1, 1)
+
+        self.retranslateUi(Form)
+        QtCore.QMetaObject.connectSlotsByName(Form)
+
+    def retranslateUi(self, Form):
+        _translate = QtCore.QCoreApplication.translate
+        Form.setWindowTitle(_translate("Form", "StockFuturesMonitor"))
+        self.radioButton.setText(_translate("Form", "股票代码"))
+        self.radioButton_2.setText(_translate("Form", "期货代码"))
+        self.label.setText(_translate("Form", "代码"))
+        self.label_2.setText(_translate("Form", "刷新时间（s）"))
+        self.pushButton_4.setText(_translate("Form", "字体颜色"))
+        self.pushButton_3.setText(_translate("Form", "背景颜色"))
+        self.pushButton.setText(_translate("Form", "开启监控"))
+        self.pushButton_2.setText(_translate("Form", "关闭"))
+        self.label_3.setText(_translate("Form", "加载数据中"))
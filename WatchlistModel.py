@@ -0,0 +1,158 @@
+from PyQt5 import QtCore, QtGui, QtWidgets
+from StockFuturesMonitor import StockFuturesMonitor
+from Analytics import Analytics
+
+# 走势列通过该角色取得最近的价格序列
+SparklineRole = QtCore.Qt.UserRole + 1
+
+
+class WatchlistModel(QtCore.QAbstractTableModel):
+    """多代码自选列表模型
+
+    每次刷新只对数值真正变化的单元格重新格式化并发出dataChanged，
+    未变化的行不做任何处理，行数较多时重绘开销保持平稳。
+    传入analytics时，鼠标悬停在行上显示该代码的VWAP、EMA和波动率。
+    """
+    COL_CODE, COL_NAME, COL_PRICE, COL_CHANGE, COL_PERCENT, COL_SPARKLINE = range(6)
+    HEADERS = ("代码", "名称", "现价", "涨跌", "涨跌幅", "走势")
+    # 每列的取值与格式化方式，对应 (名称, 现价, 涨跌, 涨跌幅) 值元组
+    FORMATS = (str, lambda v: f"{v:.3f}", lambda v: f"{v:.3f}", lambda v: f"{v:.2f}%")
+
+    def __init__(self, history=None, sparkline_points=60, parent=None, analytics=None):
+        super().__init__(parent)
+        self.history = history
+        self.analytics = analytics
+        # 为0时不显示走势列
+        self.sparkline_points = sparkline_points if history is not None else 0
+        self._codes = []
+        self._symbols = []
+        # 每行的原始值 (名称, 现价, 涨跌, 涨跌幅) 和已格式化的文本
+        self._values = []
+        self._texts = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._codes)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS) if self.sparkline_points else len(self.HEADERS) - 1
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == self.COL_CODE:
+                return self._codes[row]
+            if column < self.COL_SPARKLINE:
+                return self._texts[row][column - 1]
+        elif role == QtCore.Qt.TextAlignmentRole and self.COL_PRICE <= column <= self.COL_PERCENT:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        elif role == QtCore.Qt.ToolTipRole and self.analytics is not None:
+            symbol = self._symbols[row]
+            stats = self.analytics.stats(symbol) if symbol is not None else None
+            return Analytics.format_stats(stats) if stats else None
+        elif role == SparklineRole and column == self.COL_SPARKLINE:
+            symbol = self._symbols[row]
+            if symbol is None:
+                return None
+            return self.history.recent_prices(symbol, self.sparkline_points)
+        return None
+
+    def codes(self):
+        return list(self._codes)
+
+    def set_codes(self, codes):
+        """设置自选代码列表，仍在列表中的代码保留已有数据（休市时不会再次获取）"""
+        codes = list(codes)
+        if codes == self._codes:
+            return
+        old = {code: (self._symbols[row], self._values[row], self._texts[row])
+               for row, code in enumerate(self._codes)}
+        self.beginResetModel()
+        self._codes = codes
+        self._symbols = []
+        self._values = []
+        self._texts = []
+        for code in codes:
+            symbol, values, texts = old.get(code, (None, None, ["", "", "", ""]))
+            self._symbols.append(symbol)
+            self._values.append(values)
+            self._texts.append(list(texts))
+        self.endResetModel()
+
+    def update_quotes(self, results):
+        """用 {代码: 行情字典} 更新列表，返回发生变化的行数"""
+        changed_rows = 0
+        # 连续且变化列范围相同的行合并为一次dataChanged
+        run = None
+        last_column = self.columnCount() - 1
+        for row, code in enumerate(self._codes):
+            data = results.get(code)
+            if data is None:
+                continue
+            if 'error' in data:
+                values = (data['error'], None, None, None)
+            else:
+                name = data.get('stock_name', data.get('futures_name', data.get('spread_name', '')))
+                values = (name, data['current_price'], data['change_amount'], data['change_percent'])
+                if self._symbols[row] is None:
+                    self._symbols[row] = StockFuturesMonitor.get_data_symbol(data)
+
+            old = self._values[row]
+            if values == old:
+                continue
+            texts = self._texts[row]
+            first = last = None
+            for i, value in enumerate(values):
+                if old is not None and value == old[i]:
+                    continue
+                texts[i] = "" if value is None else self.FORMATS[i](value)
+                if first is None:
+                    first = i + 1
+                last = i + 1
+            self._values[row] = values
+            # 首次收到行情或价格变化时走势列也需要重绘
+            if self.sparkline_points and (old is None or values[1] != old[1]):
+                last = last_column
+            changed_rows += 1
+
+            if run is not None and run[1] == row - 1 and run[2] == first and run[3] == last:
+                run[1] = row
+            else:
+                self._emit_run(run)
+                run = [row, row, first, last]
+        self._emit_run(run)
+        return changed_rows
+
+    def _emit_run(self, run):
+        if run is not None:
+            self.dataChanged.emit(self.index(run[0], run[2]), self.index(run[1], run[3]))
+
+
+class SparklineDelegate(QtWidgets.QStyledItemDelegate):
+    """在单元格内绘制最近价格的走势线"""
+
+    def paint(self, painter, option, index):
+        prices = index.data(SparklineRole)
+        if not prices or len(prices) < 2:
+            return
+        low, high = min(prices), max(prices)
+        span = high - low or 1.0
+        rect = option.rect.adjusted(2, 3, -2, -3)
+        step = rect.width() / (len(prices) - 1)
+        points = [
+            QtCore.QPointF(rect.left() + i * step, rect.bottom() - (price - low) / span * rect.height())
+            for i, price in enumerate(prices)
+        ]
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtGui.QPen(option.palette.color(QtGui.QPalette.Text), 1))
+        painter.drawPolyline(QtGui.QPolygonF(points))
+        painter.restore()
@@ -0,0 +1,75 @@
+"""价格提醒引擎基准：每批行情计算全部规则的耗时
+
+用法：
+    python benchmarks/bench_alerts.py --rules 5000 --symbols 500 --ticks 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlertEngine import AlertEngine, KIND_NAMES
+from QuoteParser import load_numpy
+
+
+def build_engine(n_rules, n_symbols, use_numpy=None, seed=0):
+    rng = random.Random(seed)
+    engine = AlertEngine(use_numpy=use_numpy)
+    kinds = list(KIND_NAMES)
+    for i in range(n_rules):
+        kind = kinds[i % len(kinds)]
+        threshold = rng.uniform(-3, 3) if kind.startswith('pct_') else rng.uniform(95, 105)
+        engine.add_rule(f"sh{600000 + i % n_symbols}", kind, threshold, rng.randint(5, 60))
+    return engine
+
+
+def make_batches(n_symbols, n_ticks, seed=1):
+    """生成随机游走的行情批次 [{新浪代码: 行情字典}, ...]"""
+    rng = random.Random(seed)
+    prices = [100.0] * n_symbols
+    batches = []
+    for _ in range(n_ticks):
+        batch = {}
+        for i in range(n_symbols):
+            prices[i] *= 1 + rng.gauss(0, 0.002)
+            batch[f"sh{600000 + i}"] = {'current_price': prices[i], 'yesterday_close': 100.0}
+        batches.append(batch)
+    return batches
+
+
+def run(engine, batches):
+    timings = []
+    fired = 0
+    for batch in batches:
+        start = time.perf_counter()
+        fired += len(engine.evaluate(batch))
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings, fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', type=int, default=5000)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=1000)
+    args = parser.parse_args()
+
+    batches = make_batches(args.symbols, args.ticks)
+    print(f"{args.rules} 条规则，{args.symbols} 个代码，{args.ticks} 批行情")
+
+    cases = [('逐条规则计算', False)]
+    if load_numpy() is not None:
+        cases.insert(0, ('NumPy向量化', True))
+    for name, use_numpy in cases:
+        timings, fired = run(build_engine(args.rules, args.symbols, use_numpy), batches)
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+        print(f"{name:<12} p50 {p50:7.3f} ms  p99 {p99:7.3f} ms  共触发 {fired} 次")
+
+
+if __name__ == '__main__':
+    main()
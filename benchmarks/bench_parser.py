@@ -0,0 +1,90 @@
+"""行情解析微基准：对比原有逐行split+字典的解析方式与QuoteParser
+
+用法：
+    python benchmarks/bench_parser.py                    # 使用合成的GBK行情数据
+    python benchmarks/bench_parser.py --payload hq.txt   # 使用录制的新浪原始响应（GBK字节）
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from QuoteParser import parse_quotes, QuoteColumns, HQ_LINE_PATTERN
+from SinaStubServer import make_payload
+
+
+def legacy_parse(raw):
+    """原有解析方式：每个代码单独split引号再split逗号，逐个字段转换并构造完整字典"""
+    results = {}
+    for line in raw.decode('gbk').split('\n'):
+        if '"' not in line:
+            continue
+        symbol = line[len('var hq_str_'):line.index('=')]
+        info = line.split('"')[1].split(',')
+        if symbol.startswith('hf_'):
+            current_price = float(info[0] or 0)
+            yesterday_close = float(info[7] or 0)
+            change_amount = current_price - yesterday_close
+            results[symbol] = {
+                'type': 'futures', 'futures_code': symbol[3:], 'futures_name': info[13],
+                'current_price': current_price, 'yesterday_close': yesterday_close,
+                'open_price': float(info[8] or 0), 'high_price': float(info[4] or 0),
+                'low_price': float(info[5] or 0), 'change_amount': change_amount,
+                'change_percent': change_amount / yesterday_close * 100, 'update_time': info[6]
+            }
+        else:
+            current_price = float(info[3])
+            yesterday_close = float(info[2])
+            change_amount = current_price - yesterday_close
+            results[symbol] = {
+                'type': 'stock', 'stock_code': symbol[2:], 'stock_name': info[0],
+                'current_price': current_price, 'yesterday_close': yesterday_close,
+                'open_price': float(info[1]), 'high_price': float(info[4]),
+                'low_price': float(info[5]), 'change_amount': change_amount,
+                'change_percent': change_amount / yesterday_close * 100,
+                'update_time': f"{info[30]} {info[31]}"
+            }
+    return results
+
+
+def live_parse(raw):
+    """批量接口、推送和回放使用的方式：parse_quotes后转换为行情字典"""
+    return {symbol: quote.to_dict() for symbol, quote in parse_quotes(raw.decode('gbk')).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payload', help="录制的新浪原始响应文件（GBK编码）")
+    parser.add_argument('--stocks', type=int, default=5000)
+    parser.add_argument('--futures', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, 'rb') as f:
+            raw = f.read()
+    else:
+        raw = make_payload(args.stocks, args.futures)
+    symbols = [symbol for symbol, _ in HQ_LINE_PATTERN.findall(raw.decode('gbk'))]
+    columns = QuoteColumns(symbols)
+    print(f"{len(symbols)} 个代码，{len(raw) / 1024:.0f} KiB")
+
+    cases = [
+        ('原有逐行解析+字典', lambda: legacy_parse(raw)),
+        ('parse_quotes+to_dict', lambda: live_parse(raw)),
+        ('QuoteParser.parse_quotes', lambda: parse_quotes(raw.decode('gbk'))),
+        ('QuoteColumns.fill', lambda: columns.fill(raw.decode('gbk'))),
+    ]
+    baseline = None
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        if baseline is None:
+            baseline = best
+        per_symbol = best / max(len(symbols), 1) * 1e6
+        print(f"{name:<28} {best * 1000:8.2f} ms  {per_symbol:6.2f} us/代码  {baseline / best:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""端到端负载基准：基于本地模拟服务器测量获取、解析、显示整条链路
+
+对1、100、5000个代码分别测量同步批量接口、asyncio引擎、自选列表模型更新（model）
+以及模型更新加QTableView重绘（display）的吞吐量、p50/p99延迟、CPU时间和常驻内存峰值。
+
+用法：
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 100 5000 --rounds 20 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SinaStubServer import SinaStubServer, make_codes
+
+
+def peak_rss_mb():
+    """进程常驻内存峰值（MiB），无法获取时返回None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux单位为KiB，macOS为字节
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except Exception:
+        return None
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def measure(name, n, rounds, func):
+    """执行rounds次func，返回统计结果"""
+    func()  # 预热：建立连接
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        'case': name, 'symbols': n,
+        'throughput': n * rounds / wall,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'cpu': cpu / rounds * 1000,
+        'rss': peak_rss_mb(),
+    }
+
+
+def sync_case(codes):
+    from StockFuturesMonitor import StockFuturesMonitor
+    if len(codes) == 1:
+        return lambda: StockFuturesMonitor.get_stock_data(codes[0])
+    return lambda: StockFuturesMonitor.get_batch_data(codes)
+
+
+def async_case(codes, max_connections):
+    from AsyncQuoteEngine import AsyncQuoteEngine
+    loop = asyncio.new_event_loop()
+    engine = AsyncQuoteEngine(max_connections=max_connections)
+    return lambda: loop.run_until_complete(engine.fetch_all(codes))
+
+
+def display_case(codes, paint):
+    """获取一次行情后，交替使用两组数据更新自选列表（需要PyQt5）
+
+    paint为False时只更新模型；为True时模型接在可见的QTableView上（含走势列），每次更新后
+    同步重绘视口，两者之差即为绘制耗时。没有图形环境的Linux上使用offscreen平台。
+    """
+    if sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    from StockFuturesMonitor import StockFuturesMonitor
+    from TickHistory import TickHistory
+    from WatchlistModel import WatchlistModel, SparklineDelegate
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    # 走势列只用到最近60笔价格：不聚合K线并缩小逐笔缓冲区，以免5000个代码时内存峰值被历史缓冲区主导
+    history = TickHistory(tick_capacity=256, bar_specs=())
+    model = WatchlistModel(history=history)
+    model.set_codes(codes)
+    view = None
+    if paint:
+        view = QtWidgets.QTableView()
+        view.setModel(model)
+        view.setItemDelegateForColumn(WatchlistModel.COL_SPARKLINE, SparklineDelegate(view))
+        view.resize(640, 480)
+        view.show()
+        app.processEvents()
+    frames = [StockFuturesMonitor.get_batch_data(codes), StockFuturesMonitor.get_batch_data(codes)]
+    counter = [0]
+
+    def update():
+        counter[0] += 1
+        frame = frames[counter[0] % 2]
+        # 与主窗口一致：先写入历史（走势列的数据来源）再更新模型
+        for data in frame.values():
+            if 'error' not in data:
+                history.record(StockFuturesMonitor.get_data_symbol(data), counter[0], data['current_price'])
+        model.update_quotes(frame)
+        if view is not None:
+            view.viewport().repaint()
+        app.processEvents()
+    return update
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 5000])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--connections', type=int, default=8, help="asyncio引擎的并发连接数")
+    parser.add_argument('--latency', type=float, default=0.0, help="模拟服务器每个请求的延迟（秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    results = []
+    with SinaStubServer(latency=args.latency, error_rate=args.error_rate,
+                        malformed_rate=args.malformed_rate, seed=0) as server:
+        for n in args.sizes:
+            codes = make_codes(n)
+            cases = [('sync', lambda: sync_case(codes)),
+                     ('async', lambda: async_case(codes, args.connections)),
+                     ('model', lambda: display_case(codes, paint=False)),
+                     ('display', lambda: display_case(codes, paint=True))]
+            for name, factory in cases:
+                try:
+                    func = factory()
+                except ImportError as e:
+                    print(f"跳过 {name}/{n}: 缺少依赖 {e.name}")
+                    continue
+                results.append(measure(name, n, args.rounds, func))
+        stats = server.stats
+
+    print(f"{'case':<8} {'symbols':>7} {'quotes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'cpu ms':>8} {'rss MiB':>8}")
+    for r in results:
+        rss = f"{r['rss']:.0f}" if r['rss'] is not None else '-'
+        print(f"{r['case']:<8} {r['symbols']:>7} {r['throughput']:>10.0f} {r['p50']:>8.1f} "
+              f"{r['p99']:>8.1f} {r['cpu']:>8.1f} {rss:>8}")
+    print(f"模拟服务器: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""回放路径基准：以回放数据源代替网络，测量查询+解析的最高刷新频率
+
+用法：
+    python benchmarks/bench_replay.py --payload hq_record.txt --speed 1000 --seconds 5
+    python benchmarks/bench_replay.py --stocks 300            # 使用合成数据
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReplaySource import ReplaySource
+from QuoteParser import HQ_LINE_PATTERN
+from SinaStubServer import make_payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payload', help="PayloadRecorder录制的文件")
+    parser.add_argument('--stocks', type=int, default=300)
+    parser.add_argument('--futures', type=int, default=10)
+    parser.add_argument('--frames', type=int, default=200, help="合成数据的帧数")
+    parser.add_argument('--speed', type=float, default=1000.0)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.payload:
+        source = ReplaySource.from_payload_file(args.payload, speed=args.speed, loop=True)
+    else:
+        source = ReplaySource(speed=args.speed, loop=True)
+        for frame in range(args.frames):
+            text = make_payload(args.stocks, args.futures, seed=frame).decode('gbk')
+            for symbol, payload in HQ_LINE_PATTERN.findall(text):
+                source.add_payload(symbol, float(frame), payload)
+
+    codes = source.symbols()
+    print(f"{len(codes)} 个代码，{args.speed:g} 倍速")
+    source.start()
+    refreshes = 0
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        source.get_batch_data(codes)
+        refreshes += 1
+    rate = refreshes / args.seconds
+    print(f"{rate:.1f} 次刷新/秒，{rate * len(codes):.0f} 条行情/秒")
+
+
+if __name__ == '__main__':
+    main()
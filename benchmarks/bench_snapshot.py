@@ -0,0 +1,76 @@
+"""全市场快照基准：单进程批量接口与多进程SnapshotFarm的对比
+
+模拟服务器在独立进程中以static模式运行，避免服务器生成数据与客户端争用同一个GIL。
+依次测量单进程 StockFuturesMonitor.get_batch_data 和不同进程数的SnapshotFarm，
+输出每次快照的p50耗时、每秒代码数，以及各进程解析耗时之和（反映解析部分的并行度）。
+
+用法：
+    python benchmarks/bench_snapshot.py --symbols 5000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from StockFuturesMonitor import StockFuturesMonitor
+from SnapshotFarm import SnapshotFarm
+from RefreshScheduler import RefreshScheduler
+from SinaStubServer import make_codes
+
+
+def start_stub(latency):
+    """在子进程中启动模拟服务器，返回 (进程, 行情地址)"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'SinaStubServer.py'), '--port', '0', '--static',
+         '--latency', str(latency)],
+        stdout=subprocess.PIPE, text=True)
+    quote_url = process.stdout.readline().split(': ', 1)[1].strip()
+    process.stdout.readline()
+    return process, quote_url
+
+
+def measure(func, rounds):
+    func()  # 预热：建立连接、生成模拟数据
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0, help="模拟服务器每个请求的延迟（秒）")
+    args = parser.parse_args()
+
+    codes = make_codes(args.symbols)
+    process, StockFuturesMonitor.QUOTE_URL = start_stub(args.latency)
+    print(f"{args.symbols} 个代码，CPU核数 {os.cpu_count()}")
+    try:
+        elapsed = measure(lambda: StockFuturesMonitor.get_batch_data(codes), args.rounds)
+        baseline = elapsed
+        print(f"{'单进程批量接口':<16} p50 {elapsed * 1000:8.1f} ms  {args.symbols / elapsed:10.0f} 代码/秒  1.00x")
+        for workers in sorted(set(args.workers)):
+            # 模拟服务器不限流，不扣除请求预算
+            with SnapshotFarm(codes, workers, scheduler=RefreshScheduler(request_budget=None)) as farm:
+                elapsed = measure(farm.snapshot, args.rounds)
+                parse = farm.last_stats['parse']
+                assert farm.last_stats['updated'] == len(farm), farm.last_stats
+            print(f"{f'SnapshotFarm x{workers}':<16} p50 {elapsed * 1000:8.1f} ms  "
+                  f"{args.symbols / elapsed:10.0f} 代码/秒  {baseline / elapsed:4.2f}x  解析合计 {parse * 1000:.1f} ms")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
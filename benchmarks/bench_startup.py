@@ -0,0 +1,120 @@
+"""冷启动基准：从启动Python进程到主窗口显示的耗时
+
+对比原有方式（运行时用uic.loadUi解析.ui文件，启动时导入requests和NumPy）与
+预编译的Ui_MainWindow加延迟导入。没有显示器时使用Qt的offscreen平台。
+指定--exe时再对比 python main.py 与PyInstaller打包的程序：--onefile打包的程序每次启动
+都要先把内容解压到临时目录（sys._MEIPASS），这部分耗时只有运行打包结果才能测到。
+
+用法：
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --repeat 5 --exe dist/StockFuturesMonitor.exe
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程：窗口显示并处理完第一轮事件后输出时间戳和峰值内存（MiB，无法获取时为-1）
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+eager = {eager!r}
+if eager:
+    import requests, numpy
+from PyQt5 import QtWidgets, QtCore
+app = QtWidgets.QApplication(sys.argv[:1])
+import MainWindow
+if eager:
+    MainWindow.Ui_Form = None
+window = MainWindow.MainWindow()
+window.show()
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 / 1024
+        except Exception:
+            return -1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KiB，macOS为字节
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+def shown():
+    print(time.time(), peak_rss_mb())
+    app.quit()
+QtCore.QTimer.singleShot(0, shown)
+app.exec_()
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and sys.platform.startswith('linux'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return env
+
+
+def measure(eager):
+    """返回 (窗口显示耗时秒数, 峰值内存MiB或None)"""
+    start = time.time()
+    output = subprocess.run([sys.executable, '-c', CHILD.format(root=ROOT, eager=eager)], cwd=ROOT,
+                            env=child_env(), capture_output=True, text=True, check=True).stdout
+    shown_at, max_rss = output.split()[-2:]
+    max_rss = float(max_rss)
+    return float(shown_at) - start, max_rss if max_rss >= 0 else None
+
+
+def measure_program(command):
+    """运行 command --startup-probe 文件，返回 (窗口显示耗时秒数, None)
+
+    打包的程序没有控制台，由main.py把窗口显示的时间戳写入文件；峰值内存无法从外部统计。
+    """
+    fd, probe = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        start = time.time()
+        subprocess.run(command + ['--startup-probe', probe], cwd=ROOT, env=child_env(),
+                       capture_output=True, check=True)
+        with open(probe) as f:
+            return float(f.read()) - start, None
+    finally:
+        os.remove(probe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--exe', help="PyInstaller打包的程序路径，同时测量打包结果的启动耗时")
+    args = parser.parse_args()
+
+    cases = [
+        ('uic.loadUi+启动时导入', lambda: measure(True)),
+        ('预编译UI+延迟导入', lambda: measure(False)),
+    ]
+    if args.exe:
+        exe = os.path.abspath(args.exe)
+        cases += [
+            ('python main.py', lambda: measure_program([sys.executable, os.path.join(ROOT, 'main.py')])),
+            ('打包程序', lambda: measure_program([exe])),
+        ]
+    baseline = None
+    for name, run in cases:
+        # 第一次运行用于预热磁盘缓存和.pyc，不计入结果
+        run()
+        results = [run() for _ in range(args.repeat)]
+        elapsed = statistics.median(r[0] for r in results)
+        rss = [r[1] for r in results if r[1] is not None]
+        rss = f"{statistics.median(rss):6.1f} MiB" if rss else "     - MiB"
+        if baseline is None:
+            baseline = elapsed
+        print(f"{name:<20} 窗口显示 {elapsed * 1000:7.1f} ms  峰值内存 {rss}  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,92 @@
 import sys
-from PyQt5 import QtWidgets
-from MainWindow import MainWindow
+import argparse
+import multiprocessing
 
 if __name__ == '__main__':
-    app = QtWidgets.QApplication(sys.argv)
-    window = MainWindow()
+    # PyInstaller打包后，SnapshotFarm等使用的工作进程需要先经过freeze_support才能启动
+    multiprocessing.freeze_support()
+    if '--headless' in sys.argv[1:]:
+        # 无界面模式不加载PyQt5
+        from HeadlessMonitor import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != '--headless']))
+
+    from PyQt5 import QtWidgets
+    from MainWindow import MainWindow
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--record', metavar='DIR', help="将行情逐笔记录到该目录")
+    parser.add_argument('--record-payloads', metavar='FILE', help="将新浪原始响应录制到该文件")
+    parser.add_argument('--replay', metavar='PATH', help="回放录制的原始响应文件或逐笔记录目录，不访问网络")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速，默认1")
+    parser.add_argument('--loop', action='store_true', help="回放到末尾后从头循环")
+    parser.add_argument('--stream', metavar='URL', help="连接SSE推送源接收行情，不再按刷新时间轮询")
+    parser.add_argument('--spread', metavar='EXPR', action='append', default=[],
+                        help="品种间价差或比值，如 NQ/159659、NQ-2.5*159659，可以多次指定，也可以作为代码加入自选列表")
+    parser.add_argument('--alerts', metavar='FILE', help="从JSON文件加载价格提醒规则")
+    parser.add_argument('--diagnostics', metavar='FILE', help="Shift+F12及退出时将各阶段耗时统计导出到该文件")
+    # 启动基准使用：窗口显示后把时间戳写入FILE并退出（打包后的程序没有控制台输出）
+    parser.add_argument('--startup-probe', metavar='FILE', help=argparse.SUPPRESS)
+    args, qt_args = parser.parse_known_args()
+
+    recorder = None
+    if args.record:
+        from TickRecorder import TickRecorder
+        recorder = TickRecorder(args.record)
+
+    payload_recorder = None
+    if args.record_payloads:
+        from ReplaySource import PayloadRecorder
+        from StockFuturesMonitor import StockFuturesMonitor
+        payload_recorder = PayloadRecorder(args.record_payloads)
+        StockFuturesMonitor.payload_listener = payload_recorder
+
+    data_source = None
+    if args.replay:
+        import os
+        from ReplaySource import ReplaySource
+        if os.path.isdir(args.replay):
+            data_source = ReplaySource.from_tick_segments(args.replay, speed=args.speed, loop=args.loop)
+        else:
+            data_source = ReplaySource.from_payload_file(args.replay, speed=args.speed, loop=args.loop)
+
+    provider = None
+    if args.stream:
+        from QuoteProvider import StreamingQuoteProvider
+        provider = StreamingQuoteProvider(args.stream)
+
+    from Analytics import Analytics
+    analytics = Analytics()
+    for expression in args.spread:
+        try:
+            analytics.add_spread(expression)
+        except ValueError as e:
+            parser.error(str(e))
+
+    alert_engine = None
+    if args.alerts:
+        from AlertEngine import AlertEngine
+        alert_engine = AlertEngine()
+        alert_engine.load_rules(args.alerts)
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(recorder=recorder, data_source=data_source, alert_engine=alert_engine,
+                        diagnostics_path=args.diagnostics, provider=provider,
+                        analytics=analytics)
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    if args.startup_probe:
+        import time
+        from PyQt5 import QtCore
+
+        def startup_probe():
+            with open(args.startup_probe, 'w') as f:
+                f.write(f"{time.time()}\n")
+            app.quit()
+        QtCore.QTimer.singleShot(0, startup_probe)
+    exit_code = app.exec_()
+    if args.diagnostics:
+        window.dump_diagnostics()
+    if recorder is not None:
+        recorder.close()
+    if payload_recorder is not None:
+        payload_recorder.close()
+    sys.exit(exit_code)
@@ -0,0 +1,151 @@
+"""AsyncQuoteEngine 对本地模拟服务器的测试
+
+运行：python -m pytest tests  或  python -m unittest discover tests
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AsyncQuoteEngine import AsyncQuoteEngine
+from SinaStubServer import SinaStubServer
+from StockFuturesMonitor import StockFuturesMonitor
+
+CODES = ['600000', '000001', '159659', 'NQ', 'hf_GC', '830799']
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class AsyncQuoteEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        # static模式下每个代码的行情固定，异步引擎与同步批量接口的结果可以直接比较
+        self.stub = SinaStubServer(seed=1, static=True)
+        self.stub.__enter__()
+
+    def tearDown(self):
+        self.stub.__exit__(None, None, None)
+
+    def make_engine(self, **kwargs):
+        return AsyncQuoteEngine(**kwargs)
+
+    def test_fetch_all_matches_batch_data(self):
+        async def main():
+            engine = self.make_engine()
+            try:
+                return await engine.fetch_all(CODES)
+            finally:
+                await engine.close()
+
+        results = run(main())
+        expected = StockFuturesMonitor.get_batch_data(CODES)
+        self.assertEqual(set(results), set(CODES))
+        self.assertEqual(results['830799'], {'error': "暂不支持新三板股票查询"})
+        for code in CODES[:-1]:
+            for key in ('type', 'current_price', 'yesterday_close', 'change_amount', 'change_percent'):
+                self.assertEqual(results[code][key], expected[code][key], (code, key))
+
+    def test_stream_yields_every_code_once(self):
+        codes = [f"{600000 + i}" for i in range(500)] + ['NQ']
+
+        async def main():
+            engine = self.make_engine(max_connections=4, max_url_length=400)
+            try:
+                return [code async for code, _ in engine.stream(codes)], engine.requests
+            finally:
+                await engine.close()
+
+        seen, requests = run(main())
+        self.assertEqual(sorted(seen), sorted(codes))
+        self.assertEqual(requests, len(StockFuturesMonitor.build_batch_urls(
+            [StockFuturesMonitor.get_sina_symbol(code) for code in codes], 400)))
+
+    def test_stream_can_stop_early(self):
+        codes = [f"{600000 + i}" for i in range(300)]
+
+        async def main():
+            engine = self.make_engine(max_connections=2, max_url_length=200)
+            try:
+                async for code, quote in engine.stream(codes):
+                    return code, quote
+            finally:
+                await engine.close()
+
+        code, quote = run(main())
+        self.assertIn(code, codes)
+        self.assertIn('current_price', quote)
+
+    def test_connections_are_reused(self):
+        codes = [f"{600000 + i}" for i in range(400)]
+
+        async def main():
+            engine = self.make_engine(max_connections=2, max_url_length=300)
+            try:
+                for _ in range(3):
+                    results = await engine.fetch_all(codes)
+                    self.assertFalse([code for code, quote in results.items() if 'error' in quote])
+                return engine.requests, engine.connections_opened
+            finally:
+                await engine.close()
+
+        requests, opened = run(main())
+        self.assertGreater(requests, 6)
+        self.assertLessEqual(opened, 2)
+
+    def test_http_error_is_reported_per_code(self):
+        self.stub.error_rate = 1.0
+
+        async def main():
+            engine = self.make_engine()
+            try:
+                return await engine.fetch_all(['600000', 'NQ'])
+            finally:
+                await engine.close()
+
+        results = run(main())
+        for code in ('600000', 'NQ'):
+            self.assertIn('503', results[code]['error'])
+
+    def test_read_timeout_is_reported_per_code(self):
+        self.stub.latency = 0.5
+
+        async def main():
+            engine = self.make_engine(read_timeout=0.1)
+            try:
+                return await engine.fetch_all(['600000', 'NQ'])
+            finally:
+                await engine.close()
+
+        results = run(main())
+        for code in ('600000', 'NQ'):
+            self.assertIn('error', results[code])
+
+    def test_connection_refused_is_reported_per_code(self):
+        host, port = self.stub.address[:2]
+        self.stub.__exit__(None, None, None)
+        saved_url = StockFuturesMonitor.QUOTE_URL
+        StockFuturesMonitor.QUOTE_URL = f"http://{host}:{port}/list="
+
+        async def main():
+            engine = self.make_engine(connect_timeout=1.0)
+            try:
+                return await engine.fetch_all(['600000'])
+            finally:
+                await engine.close()
+
+        try:
+            results = run(main())
+        finally:
+            StockFuturesMonitor.QUOTE_URL = saved_url
+            # tearDown会再次停止服务器，重新创建一个空闲的服务器供其使用
+            self.stub = SinaStubServer(seed=1, static=True)
+            self.stub.__enter__()
+        self.assertIn('error', results['600000'])
+
+
+if __name__ == '__main__':
+    unittest.main()
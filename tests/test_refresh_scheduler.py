@@ -0,0 +1,70 @@
+"""RefreshScheduler 交易时段的时区测试
+
+运行：python -m pytest tests  或  python -m unittest discover tests
+"""
+import datetime
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RefreshScheduler import USTimeZone, MarketSessions, CME_GLOBEX
+
+try:
+    from zoneinfo import ZoneInfo
+    CHICAGO = ZoneInfo('America/Chicago')
+except Exception:
+    CHICAGO = None
+
+
+def chicago_timestamp(*args, fold=0):
+    """芝加哥当地时间对应的时间戳（按备用时区计算）"""
+    tz = USTimeZone(-6, 'CST', 'CDT')
+    return datetime.datetime(*args, tzinfo=tz, fold=fold).timestamp()
+
+
+class USTimeZoneTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tz = USTimeZone(-6, 'CST', 'CDT')
+
+    def test_offsets(self):
+        self.assertEqual(datetime.datetime(2026, 1, 15, 12, tzinfo=self.tz).utcoffset(),
+                         datetime.timedelta(hours=-6))
+        self.assertEqual(datetime.datetime(2026, 7, 15, 12, tzinfo=self.tz).utcoffset(),
+                         datetime.timedelta(hours=-5))
+        # 2026年夏令时为3月8日至11月1日
+        self.assertEqual(datetime.datetime(2026, 3, 8, 3, tzinfo=self.tz).tzname(), 'CDT')
+        self.assertEqual(datetime.datetime(2026, 3, 8, 1, 59, tzinfo=self.tz).tzname(), 'CST')
+        self.assertEqual(datetime.datetime(2026, 11, 1, 1, 30, tzinfo=self.tz).tzname(), 'CDT')
+        self.assertEqual(datetime.datetime(2026, 11, 1, 1, 30, fold=1, tzinfo=self.tz).tzname(), 'CST')
+
+    @unittest.skipIf(CHICAGO is None, "缺少America/Chicago时区数据")
+    def test_matches_zoneinfo_around_transitions(self):
+        for year in range(2008, 2036):
+            for month, day in ((3, 8), (11, 1)):
+                transition = USTimeZone._first_sunday(year, month, day)
+                base = transition.replace(tzinfo=CHICAGO).timestamp()
+                for minutes in range(-150, 150, 15):
+                    timestamp = base + minutes * 60
+                    expected = datetime.datetime.fromtimestamp(timestamp, CHICAGO)
+                    actual = datetime.datetime.fromtimestamp(timestamp, self.tz)
+                    self.assertEqual(actual.replace(tzinfo=None), expected.replace(tzinfo=None))
+                    self.assertEqual(actual.fold, expected.fold)
+                    self.assertEqual(actual.timestamp(), timestamp)
+
+    def test_cme_sessions_follow_daylight_time(self):
+        market = MarketSessions('CME', self.tz, CME_GLOBEX.sessions)
+        # 夏令时期间周一16:00~17:00（芝加哥时间）为每日维护，即UTC 21:00~22:00
+        self.assertFalse(market.is_open(chicago_timestamp(2026, 7, 13, 16, 30)))
+        self.assertTrue(market.is_open(chicago_timestamp(2026, 7, 13, 17, 30)))
+        self.assertEqual(market.next_open(chicago_timestamp(2026, 7, 13, 16, 30)),
+                         datetime.datetime(2026, 7, 13, 22, tzinfo=datetime.timezone.utc).timestamp())
+        # 冬令时维护为UTC 22:00~23:00
+        self.assertEqual(market.next_open(chicago_timestamp(2026, 1, 12, 16, 30)),
+                         datetime.datetime(2026, 1, 12, 23, tzinfo=datetime.timezone.utc).timestamp())
+
+
+if __name__ == '__main__':
+    unittest.main()